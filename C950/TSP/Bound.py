@@ -0,0 +1,127 @@
+import numpy as np
+from .Solver import Solver
+from ..data.Route import Route
+
+"""
+Bound class - lower bound on the shortest possible distance of a route (Held-Karp 1-tree bound)
+    iterations: int - subgradient ascent iterations
+
+    lower_bound(route: Route, upper: float = None) -> float - lower bound for the route's stops (any order, any solver)
+    nodes_bound(D: numpy.ndarray, fixed_end: bool, round_trip: bool, upper: float = None) -> float
+        lower bound for nodes from Solver.get_nodes(), the route is turned into a tour on a cycle:
+            round trip: the end stop is the start address, drop it and close the cycle
+            fixed end: add a dummy node joined to the start and the end at 0 cost
+            open: add a dummy node joined to the start at 0 cost, and to the other nodes at a big cost
+                every tour leaves the dummy through exactly one big edge, so big is subtracted back
+        upper: a known route distance, tightens the subgradient steps (default: nearest neighbor tour)
+    held_karp(C: numpy.ndarray, upper: float = None) -> float - 1-tree bound of the cycle on C
+        algorithm:
+        1-tree = minimum spanning tree on nodes 1..n-1 + the two cheapest edges of node 0,
+            its length is a lower bound, and it is a tour if every node has degree 2
+        subgradient ascent on node penalties pi: costs C[i][j] + pi[i] + pi[j], bound = 1-tree - 2 * sum(pi)
+            pi += step * (degree - 2), step from the gap to the upper bound (Polyak step)
+        O(n^2) per iteration (Prim's algorithm, vectorized over nodes)
+"""
+class Bound:
+    ITERATIONS = 100
+
+    def __init__(self, iterations = ITERATIONS):
+        self.iterations = iterations
+        self.solver = Solver()
+
+    def lower_bound(self, route: Route, upper = None) -> float:
+        nodes, fixed_end = self.solver.get_nodes(route)
+        D = self.solver.get_nodes_matrix(nodes)
+        return self.nodes_bound(D, fixed_end, nodes[0].address_id == nodes[-1].address_id, upper)
+
+    def nodes_bound(self, D, fixed_end, round_trip = False, upper = None) -> float:
+        n = len(D)
+        if fixed_end and round_trip:
+            return self.held_karp(D[:-1, :-1], upper)
+
+        # any tour through more big edges than needed is longer than every tour that avoids them
+        big = D.sum() + 1
+        C = np.full((n + 1, n + 1), big)
+        C[:n, :n] = D
+        C[n, n] = C[n, 0] = C[0, n] = 0
+        if fixed_end:
+            C[n, n - 1] = C[n - 1, n] = 0
+            return self.held_karp(C, upper)
+
+        bound = self.held_karp(C, None if upper is None else upper + big) - big
+        return max(bound, 0.0)
+
+    def held_karp(self, C, upper = None) -> float:
+        n = len(C)
+        if n <= 1:
+            return 0.0
+        if n == 2:
+            return 2 * float(C[0, 1])
+
+        if upper is None:
+            upper = nearest_neighbor(C)
+        pi = np.zeros(n)
+        best = -np.inf
+        scale = 2.0
+        stalled = 0
+        for _ in range(self.iterations):
+            length, degree = one_tree(C + pi[:, None] + pi[None, :])
+            bound = length - 2 * pi.sum()
+            if bound > best + 1e-9:
+                best = bound
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= 5:
+                    scale /= 2
+                    stalled = 0
+
+            g = degree - 2
+            norm = float(g @ g)
+            if norm == 0 or upper - bound <= 1e-9:
+                break
+            pi += scale * (upper - bound) / norm * g
+
+        return float(max(best, 0.0))
+
+def one_tree(C):
+    n = len(C)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = in_tree[1] = True
+    key = C[1].copy()
+    key[in_tree] = np.inf
+    parent = np.ones(n, dtype=np.intp)
+    degree = np.zeros(n)
+    length = 0.0
+
+    for _ in range(n - 2):
+        v = int(np.argmin(key))
+        length += key[v]
+        degree[v] += 1
+        degree[parent[v]] += 1
+        in_tree[v] = True
+        key[v] = np.inf
+
+        closer = (C[v] < key) & ~in_tree
+        key[closer] = C[v][closer]
+        parent[closer] = v
+
+    cheapest = np.argpartition(C[0, 1:], 1)[:2] + 1
+    length += C[0, cheapest].sum()
+    degree[0] = 2
+    degree[cheapest] += 1
+    return length, degree
+
+def nearest_neighbor(C):
+    n = len(C)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    node = 0
+    length = 0.0
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, C[node])
+        next = int(np.argmin(row))
+        length += row[next]
+        visited[next] = True
+        node = next
+    return length + C[node, 0]
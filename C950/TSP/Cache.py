@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from ..libs.Backend import OrderedMap
+from ..data.Route import Route, Stop
+from ..constants import CACHE_DIRNAME, CACHE_MAX_BYTES
+
+"""
+Cache class - persistent on-disk cache of solved routes
+    directory: str - cache directory, one compact json file per solved route
+    max_bytes: int - size bound of the cache directory
+
+    instance() -> Cache - singleton pattern
+
+    key(route: Route) -> str - sha256 of everything the solver reads from the route
+        packages ids, addresses, delivery windows, start time, start / end address, round trip,
+        distances between the route's addresses, truck speed and speed profile, solver identity (name, version and parameters, see Solver.identity())
+    load(route: Route) -> bool - rehydrate route.stops from the cache, False on a miss
+        an unreadable entry or one with the wrong shape is a miss
+    save(route: Route) - store the route's stop order and schedule
+    evict() - remove least recently used entries until the cache fits in max_bytes
+        a cache hit touches the entry's mtime, so mtime is the last time the entry was used
+        temp files older than TMP_MAX_AGE seconds are left over from a killed save and are removed
+
+    entries are written to a temp file then renamed with os.replace, which is atomic,
+    so several processes can share the same directory and never read a partial entry.
+"""
+class Cache:
+    _instance = None
+    TMP_MAX_AGE = 60
+
+    @staticmethod
+    def instance():
+        if Cache._instance is None:
+            Cache._instance = Cache()
+        return Cache._instance
+
+    def __init__(self, directory = os.path.join(CACHE_DIRNAME, 'routes'), max_bytes = CACHE_MAX_BYTES):
+        from ..WGUPS import WGUPS
+        self.wgups = WGUPS.instance()
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, route: Route) -> str:
+        packages = []
+        addresses_ids = [route.start_address_id, route.end_address_id]
+        for package_id in sorted(route.packages_ids):
+            package = self.wgups.packages[package_id]
+            packages.append([package.id, package.address_id, package.earliest, package.latest])
+            addresses_ids.append(package.address_id)
+
+        addresses_ids = sorted(set(id for id in addresses_ids if id is not None))
+        addresses = [self.wgups.addresses[id].full_addr for id in addresses_ids]
+        distances = [[self.wgups.distances[frm][to] for to in addresses_ids] for frm in addresses_ids]
+
+        inputs = [
+            route.tsp.identity(),
+            route.start_time, route.start_address_id, route.end_address_id, route.round_trip,
+            packages, addresses_ids, addresses, distances,
+            route.truck.speed, self.wgups.speeds.starts, self.wgups.speeds.factors
+        ]
+        data = json.dumps(inputs, separators=(',', ':'))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def load(self, route: Route) -> bool:
+        path = self.path(self.key(route))
+        try:
+            with open(path) as file:
+                entry = json.load(file)
+
+            stops = OrderedMap()
+            for address_id, packages_ids, _ in entry['stops']:
+                if not isinstance(address_id, int) or not all(isinstance(id, int) for id in packages_ids):
+                    raise TypeError('invalid stop')
+                stops[len(stops)] = Stop(route, packages_ids, address_id)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        route.stops = stops
+        return True
+
+    def save(self, route: Route):
+        entry = {
+            'route': route.id,
+            'stops': [[stop.address_id, stop.packages_ids, stop.distance] for stop in route.stops.values()],
+        }
+
+        tmp = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(entry, file, separators=(',', ':'))
+            os.replace(tmp, self.path(self.key(route)))
+        except OSError:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            return
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json') and not name.endswith('.tmp'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+                if name.endswith('.tmp'):
+                    # recent temp files may belong to a save in progress in another process
+                    if now - stat.st_mtime > self.TMP_MAX_AGE:
+                        os.remove(os.path.join(self.directory, name))
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,94 @@
+import numpy as np
+from ..constants import END_TIME
+
+"""
+Evaluator class - scores many candidate stop orders at once, without building Stop / HashMap objects
+    D: numpy.ndarray - distance matrix indexed by address index (see WGUPS.addresses_index)
+    latest: numpy.ndarray - deadline in seconds per address index, END_TIME where nothing is due
+
+    for_route(route: Route) -> Evaluator - deadlines taken from the route's packages only
+    tours(routes: list[Route]) -> numpy.ndarray - address indices of routes' current stop orders
+        routes with fewer stops are padded to the longest one by repeating their last address (zero-length legs)
+    evaluate(tours, start_time, speed) -> Evaluation
+        tours: 2-d int array, one candidate tour per row, address indices in visiting order
+            (include the start / end address, eg: a round trip starts and ends with the hub)
+        start_time: int - start time in seconds, or an int array with one start time per row
+        speed: float - truck speed in mph
+        vectorized: one gather of the leg distances and one cumulative sum along the rows,
+        distances are rounded to 0.1 mile per stop like Route.aggregate()
+        with a time dependent speed profile (wgups.speeds), arrival times are accumulated leg by leg,
+        each leg is one gather from the profile's travel time tables for all rows at once
+        a stop that repeats the previous stop's address (padding) is never counted late again
+
+Evaluation class - arrays returned by evaluate(), m tours of n stops
+    distance: (m,) total distance per tour
+    distances: (m, n) distance from the start to each stop
+    times: (m, n) arrival time in seconds at each stop
+    lateness: (m, n) seconds late at each stop, 0 if on time
+    slack: (m, n) seconds to spare before each stop's deadline, 0 if late
+    late: (m,) number of late stops per tour
+"""
+class Evaluation:
+    def __init__(self, distances, times, latest, repeated = None):
+        self.distances = distances
+        self.distance = distances[:, -1]
+        self.times = times
+        margin = latest - times
+        if repeated is not None:
+            margin[:, 1:][repeated] = np.maximum(margin[:, 1:][repeated], 0)
+        self.lateness = np.maximum(-margin, 0)
+        self.slack = np.maximum(margin, 0)
+        self.late = np.count_nonzero(margin < 0, axis=1)
+
+class Evaluator:
+    def __init__(self, D = None, latest = None):
+        from ..WGUPS import WGUPS
+        self.wgups = WGUPS.instance()
+        self.D = self.wgups.distance_matrix if D is None else np.asarray(D, dtype=np.float64)
+        if latest is None:
+            latest = self.get_latest(self.wgups.packages.keys())
+        self.latest = np.asarray(latest, dtype=np.int64)
+
+    @classmethod
+    def for_route(cls, route):
+        evaluator = cls()
+        evaluator.latest = evaluator.get_latest(route.packages_ids)
+        return evaluator
+
+    def get_latest(self, packages_ids):
+        latest = np.full(len(self.D), int(END_TIME), dtype=np.int64)
+        for package_id in packages_ids:
+            package = self.wgups.packages[package_id]
+            i = self.wgups.addresses_index[package.address_id]
+            latest[i] = min(latest[i], package.latest)
+        return latest
+
+    def tours(self, routes):
+        index = self.wgups.addresses_index
+        rows = [[index[stop.address_id] for stop in route.stops.values()] for route in routes]
+        n = max((len(row) for row in rows), default=0)
+        return np.array([row + row[-1:] * (n - len(row)) for row in rows], dtype=np.intp).reshape(len(rows), n)
+
+    def evaluate(self, tours, start_time, speed):
+        tours = np.atleast_2d(np.asarray(tours, dtype=np.intp))
+        legs = self.D[tours[:, :-1], tours[:, 1:]]
+
+        distances = np.zeros(tours.shape)
+        np.cumsum(legs, axis=1, out=distances[:, 1:])
+        distances = np.round(distances, 1)
+
+        if np.ndim(start_time) == 0:
+            start_time = int(start_time)
+        start_time = np.asarray(start_time, dtype=np.int64).reshape(-1, 1)
+        speeds = self.wgups.speeds
+        if speeds.constant:
+            times = start_time + np.rint(distances * 3600 / speed).astype(np.int64)
+        else:
+            tables = speeds.tables(self.D, speed)
+            buckets = np.asarray(speeds.buckets)
+            times = np.empty(tours.shape, dtype=np.int64)
+            times[:, 0] = start_time[:, 0]
+            for k in range(1, tours.shape[1]):
+                bucket = buckets[times[:, k - 1] // 60 % len(buckets)]
+                times[:, k] = times[:, k - 1] + tables[bucket, tours[:, k - 1], tours[:, k]]
+        return Evaluation(distances, times, self.latest[tours], tours[:, 1:] == tours[:, :-1])
@@ -0,0 +1,87 @@
+import numpy as np
+from ..Solver import Solver
+from ...data.Route import Route
+
+"""
+HeldKarp class - exact (optimal distance) tsp solver, bitmask dynamic programming
+    max_stops: int - largest number of free stops solved exactly (stops between the start and a fixed end)
+        time O(2^n * n^2), memory O(2^n * n): 16 stops ~ 8 MB, 18 stops ~ 40 MB, 20 stops ~ 170 MB
+    fallback: Solver - solver used above max_stops, default: Insertion
+
+    solve(route: Route) - can be called from outside
+        supports round trip, fixed end (end_address_id) and open (round_trip=False) routes like Insertion
+        only distance is optimized, delivery deadlines are not taken into account
+
+    _solve(D: numpy.ndarray, fixed_end: bool) -> list[int] - optimal node order
+        algorithm:
+        cost[mask, j] = shortest path from the start through the free stops in mask, ending at stop j
+        for every subset size k = 2 .. n, for every last stop j:
+            cost[mask, j] = min over i of cost[mask - j, i] + D[i][j]
+            computed for all masks of size k containing j at once (vectorized over subsets)
+        the best last stop then closes the tour (to the fixed end, or nothing for an open route)
+"""
+class HeldKarp(Solver):
+    MAX_STOPS = 18
+
+    def __init__(self, max_stops = MAX_STOPS, fallback = None):
+        super().__init__()
+        if fallback is None:
+            from ..Hueristic.Insertion import Insertion
+            fallback = Insertion()
+        self.max_stops = max_stops
+        self.fallback = fallback
+
+    def identity(self) -> list:
+        return super().identity() + [self.max_stops, self.fallback.identity()]
+
+    def solve(self, route: Route):
+        nodes, fixed_end = self.get_nodes(route)
+        free = len(nodes) - (2 if fixed_end else 1)
+        if free > self.max_stops:
+            self.fallback.solve(route)
+            return
+
+        D = self.get_nodes_matrix(nodes)
+        self.set_stops(route, nodes, self._solve(D, fixed_end))
+
+    def _solve(self, D, fixed_end):
+        n = len(D)
+        end = n - 1 if fixed_end else None
+        free = np.arange(1, n - 1 if fixed_end else n)
+        m = len(free)
+        if m == 0:
+            return list(range(n))
+
+        F = D[np.ix_(free, free)]
+        size = 1 << m
+        cost = np.full((size, m), np.inf)
+        parent = np.full((size, m), -1, dtype=np.int8)
+        bits = 1 << np.arange(m)
+        cost[bits, np.arange(m)] = D[0, free]
+
+        masks = np.arange(size)
+        popcount = np.zeros(size, dtype=np.int8)
+        for j in range(m):
+            popcount += (masks >> j) & 1
+
+        for k in range(2, m + 1):
+            layer = masks[popcount == k]
+            for j in range(m):
+                with_j = layer[(layer & bits[j]) != 0]
+                paths = cost[with_j ^ bits[j]] + F[:, j]
+                best = np.argmin(paths, axis=1)
+                cost[with_j, j] = paths[np.arange(len(with_j)), best]
+                parent[with_j, j] = best
+
+        full = size - 1
+        closing = cost[full] + (D[free, end] if fixed_end else 0)
+        j = int(np.argmin(closing))
+
+        order = []
+        mask = full
+        while j >= 0:
+            order.append(int(free[j]))
+            mask, j = mask ^ int(bits[j]), int(parent[mask, j])
+        order.reverse()
+
+        return [0] + order + ([end] if fixed_end else [])
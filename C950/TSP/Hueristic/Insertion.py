@@ -2,6 +2,7 @@ from sys import float_info
 from ..Solver import Solver
 from ...data.Route import Route, Stop
 from ...libs.Hash import HashMap
+from ...libs.Backend import OrderedMap
 
 """
 Insertion class - insertion lowest cost (heuristic) tsp solver
@@ -45,7 +46,7 @@ class Insertion(Solver):
         self.stops_dict = self.get_stops_dict(self.route)
         self.not_visited = sorted(self.stops_dict.values(), key=lambda s: s.latest)
 
-        self.stops = HashMap()
+        self.stops = OrderedMap()
         self.set_start(self.stops)
         self.set_end(self.stops)
 
@@ -72,7 +73,7 @@ class Insertion(Solver):
             self.can_insert_end = True
 
     def finalize(self, route: Route):
-        route.stops = HashMap()
+        route.stops = OrderedMap()
         for stop in self.stops.values():
             route.stops[len(route.stops)] = stop
         self.clear()
@@ -107,4 +108,4 @@ class Insertion(Solver):
             else:
                 mid = insert_after.key / 2 + insert_after.next.key / 2
             self.stops[mid] = insert_stop
-         
\ No newline at end of file
+         
\ No newline at end of file
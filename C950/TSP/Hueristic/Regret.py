@@ -0,0 +1,151 @@
+import numpy as np
+from ..Solver import Solver
+from ...data.Route import Route
+from ...libs.Heap import Heap
+
+"""
+Regret class - regret-k insertion (heuristic) tsp solver
+    k: int - number of best insertion positions kept per stop, default: 2 (regret-2), 1 is cheapest insertion
+
+    solve(route: Route) - can be called from outside
+        supports round trip, fixed end (end_address_id) and open (round_trip=False) routes like Insertion
+        only distance is optimized, delivery deadlines are not taken into account (same as HeldKarp)
+
+    _solve(D: numpy.ndarray, fixed_end: bool) -> list[int] - node order
+        algorithm:
+        every stop not in the tour keeps its k cheapest insertions (cost, edge), edge a is a -> next[a]
+            cost of inserting v into edge a -> b = D[a][v] + D[v][b] - D[a][b]
+            regret(v) = sum of (i-th cheapest - cheapest) for i = 2 .. k
+        stops are in an indexed heap (libs.Heap), largest regret first, then cheapest insertion
+        while not all stops are in the tour:
+            pop the stop with the largest regret, insert it at its cheapest edge a -> b
+            stops whose k best use the removed edge a -> b are recomputed over the whole tour
+                (users[a] remembers which stops used edge a, lazily: stale entries are skipped)
+            every other stop keeps its entries and only checks the two new edges a -> u and u -> b,
+                vectorized over all stops, the ones that improve are merged and updated in the heap
+        O(n^2) like Insertion, plus O(n) per recomputed stop
+        an open route gets a virtual end at zero distance from every node, dropped from the order
+"""
+class Regret(Solver):
+    def __init__(self, k = 2):
+        super().__init__()
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        self.k = k
+
+    def identity(self) -> list:
+        return super().identity() + [self.k]
+
+    def solve(self, route: Route):
+        nodes, fixed_end = self.get_nodes(route)
+        D = self.get_nodes_matrix(nodes)
+        self.set_stops(route, nodes, self._solve(D, fixed_end))
+
+    def priority(self, top):
+        cheapest = top[0][0]
+        regret = sum(cost - cheapest for cost, _ in top[1:])
+        return (-regret, cheapest)
+
+    def _solve(self, D, fixed_end):
+        n = len(D)
+        if not fixed_end:
+            D = np.pad(D, ((0, 1), (0, 1)))
+        end = len(D) - 1
+        free = list(range(1, end))
+        if len(free) == 0:
+            return list(range(n))
+
+        k = self.k
+        self.D = D
+        self.next = np.full(len(D), -1)
+        self.next[0] = end
+        self.edges = [0]
+        self.top = [None] * len(D)
+        self.worst = np.full(len(D), np.inf)
+        self.users = [[] for _ in range(len(D))]
+        self.heap = Heap()
+        self.handles = [None] * len(D)
+
+        for v in free:
+            self.top[v] = [(float(D[0, v] + D[v, end] - D[0, end]), 0)]
+            self.users[0].append(v)
+            self.handles[v] = self.heap.push(v, self.priority(self.top[v]))
+            if k == 1:
+                self.worst[v] = self.top[v][0][0]
+
+        unrouted = np.array(free)
+        while self.heap:
+            u, _ = self.heap.pop()
+            a = self.top[u][0][1]
+            b = int(self.next[a])
+            self.next[a] = u
+            self.next[u] = b
+            self.edges.append(u)
+            self.top[u] = None
+            unrouted = unrouted[unrouted != u]
+            if len(unrouted) == 0:
+                break
+
+            stale = set()
+            for v in self.users[a]:
+                if self.top[v] is not None and any(edge == a for _, edge in self.top[v]):
+                    stale.add(v)
+            self.users[a] = []
+            if len(stale) > 0:
+                self.recompute(sorted(stale))
+
+            cost_a = D[a, unrouted] + D[unrouted, u] - D[a, u]
+            cost_u = D[u, unrouted] + D[unrouted, b] - D[u, b]
+            worst = self.worst[unrouted]
+            better = (cost_a < worst) | (cost_u < worst)
+            for v, x, y in zip(unrouted[better].tolist(), cost_a[better].tolist(), cost_u[better].tolist()):
+                if v in stale:
+                    continue
+                self.merge(v, [(x, a), (y, u)])
+
+        order = []
+        node = 0
+        while node != -1:
+            order.append(node)
+            node = int(self.next[node])
+        if not fixed_end:
+            order.pop()
+        self.clear()
+        return order
+
+    def clear(self):
+        self.D = None
+        self.next = None
+        self.edges = None
+        self.top = None
+        self.worst = None
+        self.users = None
+        self.heap = None
+        self.handles = None
+
+    def set_top(self, v, top):
+        for _, edge in top:
+            if all(edge != old for _, old in self.top[v]):
+                self.users[edge].append(v)
+        self.top[v] = top
+        self.worst[v] = top[-1][0] if len(top) == self.k else np.inf
+        self.heap.update(self.handles[v], self.priority(top))
+
+    def merge(self, v, entries):
+        self.set_top(v, sorted(self.top[v] + entries)[:self.k])
+
+    def recompute(self, stale):
+        D = self.D
+        A = np.array(self.edges)
+        B = self.next[A]
+        V = np.array(stale)
+        C = D[np.ix_(A, V)] + D[np.ix_(V, B)].T - D[A, B][:, None]
+        m = min(self.k, len(A))
+        if m < len(A):
+            best = np.argpartition(C, m - 1, axis=0)[:m]
+        else:
+            best = np.repeat(np.arange(len(A))[:, None], len(V), axis=1)
+
+        for j, v in enumerate(stale):
+            self.top[v] = []
+            self.set_top(v, sorted((float(C[i, j]), int(A[i])) for i in best[:, j].tolist()))
@@ -0,0 +1,239 @@
+import random
+from time import monotonic
+from threading import Event
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from ..Solver import Solver
+from ...data.Route import Route
+from ...libs.Shared import SharedArray, rows
+
+"""
+IteratedLocalSearch class - anytime multi-start iterated local search tsp solver
+    budget: float - wall-clock time budget in seconds, at least one restart always runs (even with budget <= 0)
+    workers: int - number of worker processes, 1 runs in-process (no pool start up cost)
+    seed: int - first restart seed, restart i uses seed + i
+        the first restart starts from the stops sorted by latest, the others from a random order
+    callback: function(Solution) - called every time the best solution so far improves
+    slice: float - time in seconds a restart runs before reporting back to the pool
+    gap: float - stop as soon as the best cost is within gap of the route's lower bound (see TSP.Bound),
+        eg: 0.01 stops at 1% above the bound, None always spends the whole budget
+
+    cancel() - stop solving as soon as possible, the best solution found so far is kept
+        can be called from another thread or from the callback
+        with workers > 1, a multiprocessing Event given to every worker when it starts stops the running restarts too,
+        it is also set when the pool is done (budget spent or gap reached), so closing the pool does not wait a slice
+
+    solve(route: Route) - can be called from outside
+        algorithm (each restart):
+            local search (2-opt reversal + single stop relocation) from the initial order
+            until the time slice is spent:
+                perturb the best order (double bridge), local search, keep it if it is better
+        with workers > 1, restarts run in a process pool, new seeds are submitted as restarts finish,
+        workers only receive the nodes distance matrix and deadlines (no WGUPS state),
+        the matrix is published once per solve in shared memory (see libs.Shared), tasks only carry its handle
+
+    cost = distance + LATE_PENALTY * hours late, summed over stops
+        so on time deliveries come first, then distance
+        arrival times follow the speed profile (wgups.speeds), workers get its per minute buckets and factors
+
+Solution class - best solution so far
+    cost: float - see above
+    distance: float - tour distance in miles
+    order: list[int] - node indices in visiting order (see Solver.get_nodes())
+    seed: int - seed of the restart that found it
+    elapsed: float - seconds since solve() started
+"""
+LATE_PENALTY = 1000.0
+
+class Solution:
+    def __init__(self, cost, distance, order, seed, elapsed):
+        self.cost = cost
+        self.distance = distance
+        self.order = order
+        self.seed = seed
+        self.elapsed = elapsed
+
+class IteratedLocalSearch(Solver):
+    def __init__(self, budget = 1.0, workers = 1, seed = 0, callback = None, slice = 0.25, gap = None):
+        super().__init__()
+        self.budget = budget
+        self.workers = workers
+        self.seed = seed
+        self.callback = callback
+        self.slice = slice
+        self.gap = gap
+        self.cancelled = Event()
+        self.stop = None
+
+    def identity(self) -> list:
+        return super().identity() + [self.budget, self.seed, self.gap]
+
+    def cancel(self):
+        self.cancelled.set()
+        stop = self.stop
+        if stop is not None:
+            stop.set()
+
+    def solve(self, route: Route):
+        self.cancelled.clear()
+        self.started = monotonic()
+        self.best = None
+
+        nodes, fixed_end = self.get_nodes(route)
+        D = self.get_nodes_matrix(nodes)
+        self.target = None
+        if self.gap is not None:
+            from ..Bound import Bound
+            round_trip = nodes[0].address_id == nodes[-1].address_id
+            self.target = Bound().nodes_bound(D, fixed_end, round_trip) * (1 + self.gap)
+
+        latest = [stop.latest for stop in nodes]
+        speeds = self.wgups.speeds
+        profile = None if speeds.constant else (speeds.buckets, speeds.factors)
+        args = (D, latest, route.start_time, route.truck.speed, fixed_end, profile)
+
+        if self.workers <= 1:
+            self._solve(args)
+        else:
+            self._solve_pool(args)
+
+        self.set_stops(route, nodes, self.best.order)
+
+    def update(self, result, seed):
+        cost, distance, order = result
+        if self.best is None or cost < self.best.cost:
+            self.best = Solution(cost, distance, order, seed, monotonic() - self.started)
+            if self.callback is not None:
+                self.callback(self.best)
+
+    def remaining(self):
+        return self.budget - (monotonic() - self.started)
+
+    def done(self):
+        if self.cancelled.is_set() or self.remaining() <= 0:
+            return True
+        return self.target is not None and self.best is not None and self.best.cost <= self.target
+
+    def _solve(self, args):
+        args = (args[0].tolist(),) + args[1:]
+        seed = self.seed
+        while True:
+            budget = min(self.slice, self.remaining())
+            self.update(search(*args, seed, budget, self.cancelled.is_set, self.target), seed)
+            seed += 1
+            if self.done():
+                break
+
+    def _solve_pool(self, args):
+        seed = self.seed
+        pending = {}
+        context = get_context()
+        self.stop = context.Event()
+        if self.cancelled.is_set():
+            self.stop.set()
+        with SharedArray(args[0]) as D, ProcessPoolExecutor(self.workers, mp_context=context, initializer=set_stop, initargs=(self.stop,)) as pool:
+            args = (D.handle,) + args[1:]
+            while True:
+                # at least one restart runs, even with no budget left, so there always is a best order
+                while len(pending) < self.workers and not (self.done() and (self.best is not None or len(pending) > 0)):
+                    budget = min(self.slice, self.remaining())
+                    pending[pool.submit(search_shared, *args, seed, budget, self.target)] = seed
+                    seed += 1
+                if len(pending) == 0:
+                    break
+
+                done, _ = wait(pending, timeout=self.slice, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.update(future.result(), pending.pop(future))
+
+                if self.best is not None and self.done():
+                    for future in pending:
+                        future.cancel()
+                    break
+
+            # running restarts return their best order so far instead of spending the rest of their slice
+            self.stop.set()
+        self.stop = None
+
+# worker process state, set by the pool's initializer
+_stop = None
+
+def set_stop(stop):
+    global _stop
+    _stop = stop
+
+def search_shared(handle, latest, start_time, speed, fixed_end, profile, seed, budget, target):
+    return search(rows(handle), latest, start_time, speed, fixed_end, profile, seed, budget, _stop.is_set, target)
+
+def search(D, latest, start_time, speed, fixed_end, profile, seed, budget, stop = None, target = None):
+    n = len(D)
+    last = n - 1 if fixed_end else n
+    tour = list(range(n))
+    if seed != 0:
+        free = tour[1:last]
+        random.Random(seed).shuffle(free)
+        tour[1:last] = free
+
+    rng = random.Random(seed)
+    deadline = monotonic() + budget
+    cost = lambda tour: tour_cost(tour, D, latest, start_time, speed, profile)
+    best = local_search(tour, last, cost, deadline)
+    while monotonic() < deadline and not (stop is not None and stop()):
+        if target is not None and best[0] <= target:
+            break
+        tour = perturb(best[2], last, rng)
+        candidate = local_search(tour, last, cost, deadline)
+        if candidate[0] < best[0]:
+            best = candidate
+
+    return best
+
+def tour_cost(tour, D, latest, start_time, speed, profile = None):
+    distance = 0.0
+    lateness = 0.0
+    time = start_time
+    prev = tour[0]
+    for node in tour[1:]:
+        distance += D[prev][node]
+        if profile is None:
+            time = start_time + distance * 3600 / speed
+        else:
+            buckets, factors = profile
+            time += D[prev][node] * 3600 / (speed * factors[buckets[int(time) // 60 % len(buckets)]])
+        late = time - latest[node]
+        if late > 0:
+            lateness += late
+        prev = node
+    return distance + LATE_PENALTY * lateness / 3600, distance
+
+def local_search(tour, last, tour_cost, deadline):
+    cost, distance = tour_cost(tour)
+    improved = True
+    while improved and monotonic() < deadline:
+        improved = False
+        for i in range(1, last - 1):
+            for j in range(i + 1, last):
+                # 2-opt: reverse tour[i..j]
+                candidate = tour[:i] + tour[i:j + 1][::-1] + tour[j + 1:]
+                c, d = tour_cost(candidate)
+                if c < cost - 1e-9:
+                    tour, cost, distance, improved = candidate, c, d, True
+                    continue
+
+                # relocate: move tour[i] right after tour[j]
+                candidate = tour[:i] + tour[i + 1:j + 1] + [tour[i]] + tour[j + 1:]
+                c, d = tour_cost(candidate)
+                if c < cost - 1e-9:
+                    tour, cost, distance, improved = candidate, c, d, True
+
+    return cost, distance, tour
+
+def perturb(tour, last, rng):
+    free = last - 1
+    if free < 4:
+        i, j = sorted(rng.sample(range(1, last), 2)) if free >= 2 else (1, 1)
+        return tour[:i] + tour[i:j + 1][::-1] + tour[j + 1:]
+
+    # double bridge: A B C D -> A C B D on the free part of the tour
+    a, b, c = sorted(rng.sample(range(2, last), 3))
+    return tour[:1] + tour[1:a] + tour[b:c] + tour[a:b] + tour[c:last] + tour[last:]
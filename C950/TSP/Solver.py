@@ -1,21 +1,39 @@
-from ..libs.Hash import HashMap, HashSet
+from ..libs.Hash import HashMap
+from ..libs.Backend import OrderedMap, Set
 from ..libs.dtime import dtime
 from ..data.Route import Route, Stop
+from ..constants import TSP_SOLVER, TSP_SOLVER_OPTIONS
 
 """
 Solver class - base class for all tsp solvers
+    VERSION: int - bump when a solver's output changes, invalidates its cached routes (see TSP.Cache)
+    identity() -> list - solver name, version and any parameter that changes its output, part of the cache key
     get_addresses_ids(route: Route) -> list[int] - get addresses ids from route's packages ids
     get_distances_map(addresses_ids: list[int]) -> HashMap[int, HashMap[int, float]] - get distances map from addresses ids
         [Changed]: just use the full distances map wgups.distances
     get_stops_dict(route: Route) -> dict[int, Stop] - get list of stops that have packages to be delivered
+    get_nodes(route: Route) -> (list[Stop], bool) - route's stops as tour nodes and if the tour has a fixed end
+        nodes[0] is the start stop, nodes[-1] is the end stop when the end is fixed (round trip or end_address_id),
+        the nodes in between are sorted by latest and free to be ordered (same start / end rules as Insertion)
+    get_nodes_matrix(nodes: list[Stop]) -> numpy.ndarray - distances between nodes, D[i][j] from nodes[i] to nodes[j]
+    set_stops(route: Route, nodes: list[Stop], order: list[int]) - set route.stops to nodes in the given order
+
+create_solver(name: str, options: dict) -> Solver - solver by name, default: TSP_SOLVER with TSP_SOLVER_OPTIONS (constants.py)
+    names: 'insertion' (Insertion), 'regret' (Regret), 'held_karp' (HeldKarp), 'ils' (IteratedLocalSearch)
+    options are the solver's constructor keyword arguments, only the chosen solver's module is imported
 """
 class Solver:
+    VERSION = 1
+
     def __init__(self):
         from ..WGUPS import WGUPS
         self.wgups = WGUPS.instance()
 
+    def identity(self) -> list:
+        return [type(self).__name__, self.VERSION]
+
     def get_addresses_ids(self, route: Route) -> list:
-        hs = HashSet()
+        hs = Set()
         hs.insert(route.start_address_id)
         if not route.round_trip and route.end_address_id is not None:
             hs.insert(route.end_address_id)
@@ -42,9 +60,12 @@ class Solver:
         # return distances_map
     
     def get_stops_dict(self, route) -> dict:
-        sorted = HashMap(default_value=[])
+        # ordered by address id, ties in the later sort by latest keep this order
+        sorted = OrderedMap()
         for id in route.packages_ids:
             package = self.wgups.packages[id]
+            if sorted[package.address_id] is None:
+                sorted[package.address_id] = []
             sorted[package.address_id].append(id)
 
         stops_dict = {}
@@ -52,4 +73,47 @@ class Solver:
             stops_dict[address_id] = Stop(route, packages_ids, address_id)
 
         return stops_dict
-    
+
+    def get_nodes(self, route: Route) -> tuple:
+        stops_dict = self.get_stops_dict(route)
+        start = stops_dict.pop(route.start_address_id, None)
+        if start is None:
+            start = Stop(route, [], route.start_address_id)
+
+        end = None
+        if route.round_trip:
+            end = Stop(route, [], route.start_address_id)
+        elif route.end_address_id is not None:
+            end = stops_dict.pop(route.end_address_id, None)
+            if end is None:
+                end = Stop(route, [], route.end_address_id)
+
+        nodes = [start] + sorted(stops_dict.values(), key=lambda s: s.latest)
+        if end is not None:
+            nodes.append(end)
+        return nodes, end is not None
+
+    def get_nodes_matrix(self, nodes: list):
+        import numpy as np
+        index = [self.wgups.addresses_index[stop.address_id] for stop in nodes]
+        return self.wgups.distance_matrix[np.ix_(index, index)]
+
+    def set_stops(self, route: Route, nodes: list, order: list):
+        route.stops = OrderedMap()
+        for i in order:
+            route.stops[len(route.stops)] = nodes[i]
+
+def create_solver(name = None, options = None) -> Solver:
+    name = TSP_SOLVER if name is None else name
+    options = TSP_SOLVER_OPTIONS if options is None else options
+    if name == 'insertion':
+        from .Hueristic.Insertion import Insertion as solver
+    elif name == 'regret':
+        from .Hueristic.Regret import Regret as solver
+    elif name == 'held_karp':
+        from .Exact.HeldKarp import HeldKarp as solver
+    elif name == 'ils':
+        from .Metaheuristic.IteratedLocalSearch import IteratedLocalSearch as solver
+    else:
+        raise ValueError(f"unknown tsp solver '{name}', expected 'insertion', 'regret', 'held_karp' or 'ils'")
+    return solver(**options)
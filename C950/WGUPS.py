@@ -1,29 +1,86 @@
+import os
 import csv
+import json
+import hashlib
+import tempfile
 from .libs.dtime import dtime
-from .libs.Hash import HashMap
+from .libs.Backend import Map, StateMap
+from .libs.Persistent import PersistentHashMap
 from .data.Address import Address
 from .data.Package import Package
+from .data.PackageTable import PackageTable
+from .data.PackageIndex import PackageIndex
+from .data.Constraint import Constraints
 from .data.Truck import Truck
+from .data.Hub import Hubs
 from .data.Route import Route
-from .constants import START_TIME, HUB_ID, ADDRESSES_FILENAME, DISTANCES_FILENAME, PACKAGES_FILENAME, TRUCKS_FILENAME, ROUTES_FILENAME
+from .data.Speed import SpeedProfile
+from .constants import METRIC_CLOSURE, STORAGE_BACKEND, SOLVE_WORKERS, CACHE_DIRNAME, START_TIME, ADDRESSES_FILENAME, DISTANCES_FILENAME, PACKAGES_FILENAME, TRUCKS_FILENAME, ROUTES_FILENAME, SPEEDS_FILENAME, HUBS_FILENAME
 
 """
 WGUPS class - core of the program
     addresses: HashMap[int, Address]
     distances: HashMap[int, HashMap[int, float]] - distances between addresses
         eg: distance from address 1 to address 2: wgups.distances[1][2]
+        with METRIC_CLOSURE, distances are the shortest paths through other addresses (see libs.Metric)
+    metric: MetricClosure - shortest paths between addresses, None if METRIC_CLOSURE is off or numpy is missing
+        built on first use (see path()), from the direct distances
+    addresses_ids: list[int] - addresses ids in distances.csv order
+    addresses_index: HashMap[int, int] - address id -> row / column in distance_matrix
+    distance_matrix: numpy.ndarray - dense copy of distances, built on first use (numpy required)
     packages: HashMap[int, Package]
+    package_table: PackageTable - packages' fields in typed columns, packages are views onto its rows
+    index: PackageIndex - packages by address, deadline, route, truck, zip code and city
+    constraints: Constraints - packages' constraints parsed from their notes (truck, group, delays, address fixes)
     trucks: HashMap[str, Truck]
+    hubs: Hubs - depots, routes are solved per hub, packages' nearest hub is checked but not enforced (see Hubs)
+    speeds: SpeedProfile - trucks' speed factor per time of day
     routes: HashMap[str, Route]
+    time: int - current time in seconds, packages' status and trucks' positions are read at this time
 
     instance() -> WGUPS - singleton pattern
     load() - load data
         load_addresses() - load addresses from csv file
         load_distances() - load distances from csv file
+            close_distances() - shortest path closure of distances, reports direct distances longer than a path
+                the corrected distances are cached to disk, keyed by a hash of the distances file,
+                so later loads apply them without numpy or the O(n^3) closure
         load_packages() - load packages from csv file
+        load_constraints() - parse and index packages' constraints
         load_trucks() - load trucks from csv file
+        load_hubs() - load hubs from csv file, a single hub at HUB_ID if the file does not exist
+        load_speeds() - load speed profile from csv file, constant speed if the file does not exist
         load_routes() - load routes from csv file
+            a route without start address starts from its truck's hub
+            warns about packages routed from another hub than the one they are assigned to (see Hubs.check())
+            with SOLVE_WORKERS > 1 routes are solved right away, hubs in parallel (see Hubs.solve())
+        load_index() - build packages' secondary indexes, then kept up to date by the package table
+
+    path(from_id, to_id) -> list[int] - addresses ids driven through from an address to another, both included
+
+    share() -> dict[str, tuple] - publish distance_matrix and package_table once in shared memory (see libs.Shared)
+        returns handles for worker processes, 'distances' and one per package table column
+            rows(handles['distances'])[i][j] or array(handles['distances']) - distances by addresses_index
+            PackageTable.attach(handles) - packages' columns
+        a dict: HashMap buckets depend on the process' string hash seed, they do not survive pickling to a new process
+        nothing is copied or pickled per task, the published data is a copy taken at the first call
+    unshare() - release the shared memory, the next share() publishes the current data (also done at exit)
+
+    maps are created by the storage backend (STORAGE_BACKEND, see libs.Backend), HashMap by default
+    with the 'persistent' backend, addresses, packages, trucks and routes are PersistentHashMap (see libs.Persistent)
+    truck_position(truck_id: str, time: int = None) -> Position - where a truck is at a time (default: wgups.time)
+        on the route running at that time, else the last finished route, else the first route to start
+        see Route.position(), O(routes of the truck + log stops)
+
+    snapshot() -> tuple - O(1) copy of time, packages, trucks and routes to branch a what-if scenario
+        packages and routes are changed in a branch by copy, not in place (see Package.__copy__(), Route.__copy__())
+        eg: state = wgups.snapshot(); wgups.packages[9] = changed_package; ...; wgups.restore(state)
+        eg: route = copy.copy(wgups.routes['Route 1A']); route.set_start_time(...); wgups.routes[route.id] = route
+    restore(snapshot) - O(n), go back to a snapshot, the snapshot can be restored again later
+        the maps are restored in O(1), what is derived from them is rebuilt:
+        the package table's live rows and routes, the index and the solved routes' schedules
 """
+
 class WGUPS:
     _instance = None
 
@@ -38,7 +95,9 @@ class WGUPS:
             self = super(WGUPS, cls).__new__(cls)
             cls._instance = self
             
-            self.time = START_TIME
+            self.time = int(START_TIME)
+            self.shared = None
+            self.index = None
             self.load()
 
         return cls._instance
@@ -47,11 +106,15 @@ class WGUPS:
         self.load_addresses()
         self.load_distances()
         self.load_packages()
+        self.load_constraints()
         self.load_trucks()
+        self.load_hubs()
+        self.load_speeds()
         self.load_routes()
+        self.load_index()
 
     def load_addresses(self, filename = ADDRESSES_FILENAME):
-        data = HashMap()
+        data = StateMap()
         with open(filename) as csv_file:
             addresses = csv.DictReader(csv_file, delimiter=',')
             for address in addresses:
@@ -64,8 +127,11 @@ class WGUPS:
     
     def load_distances(self, filename = DISTANCES_FILENAME):
         # Addresses must be loaded before distances
-        addresses_ids = [id for id in self.addresses.keys()]
-        data = HashMap(default_value= HashMap())
+        addresses_ids = list(self.addresses.keys())
+        addresses_index = Map()
+        for i, id in enumerate(addresses_ids):
+            addresses_index[id] = i
+        data = Map(default_value= Map())
         with open(filename) as csv_file:
             distances = csv.reader(csv_file, delimiter=',')
             distances = list(distances)
@@ -80,21 +146,135 @@ class WGUPS:
                     data[id_j][id_i] = d
                 
         self.distances = data
+        self.addresses_ids = addresses_ids
+        self.addresses_index = addresses_index
+        self._distance_matrix = None
+        self._metric = None
+        self._violations = None
+        if METRIC_CLOSURE:
+            self.close_distances(filename)
+
+    def close_distances(self, filename = DISTANCES_FILENAME):
+        with open(filename, 'rb') as file:
+            key = hashlib.sha256(file.read()).hexdigest()
+        path = os.path.join(CACHE_DIRNAME, 'metric', f'{key}.json')
+
+        # violations: [i, j, direct distance, shortest path distance]
+        violations = self.load_violations(path)
+        if violations is None:
+            try:
+                from .libs.Metric import MetricClosure
+            except ImportError:
+                print('[Warning] numpy is not installed, distances are not closed under shortest paths')
+                return
+
+            ids = self.addresses_ids
+            metric = MetricClosure(self.distance_matrix)
+            violations = [[i, j, self.distances[ids[i]][ids[j]], float(metric.D[i][j])] for i, j in metric.violations]
+            self.save_violations(path, violations)
+            self._metric = metric
+
+        if len(violations) > 0:
+            print(f'[Warning] {len(violations)} distances are longer than a path through other addresses, using the shortest paths')
+
+        ids = self.addresses_ids
+        for i, j, _, distance in violations:
+            self.distances[ids[i]][ids[j]] = distance
+        self._violations = violations
+        self._distance_matrix = None if self._metric is None else self._metric.D
+
+    def load_violations(self, path):
+        n = len(self.addresses_ids)
+        try:
+            with open(path) as file:
+                violations = json.load(file)
+            for i, j, direct, distance in violations:
+                if not (0 <= i < n and 0 <= j < n) or not distance < direct:
+                    raise ValueError('invalid violation')
+        except (OSError, ValueError, TypeError):
+            return None
+        return violations
+
+    def save_violations(self, path, violations):
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(violations, file, separators=(',', ':'))
+            os.replace(tmp, path)
+        except OSError:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    @property
+    def metric(self):
+        if self._metric is None and self._violations is not None:
+            try:
+                from .libs.Metric import MetricClosure
+            except ImportError:
+                return None
+            D = self.distance_matrix.copy()
+            for i, j, direct, _ in self._violations:
+                D[i][j] = direct
+            self._metric = MetricClosure(D)
+        return self._metric
+
+    def path(self, from_id, to_id):
+        metric = self.metric
+        if metric is None:
+            return [from_id] if from_id == to_id else [from_id, to_id]
+        path = metric.path(self.addresses_index[from_id], self.addresses_index[to_id])
+        return [self.addresses_ids[i] for i in path]
+
+    @property
+    def distance_matrix(self):
+        # numpy is only imported by the tools that use the dense matrix
+        if self._distance_matrix is None:
+            import numpy as np
+            ids = self.addresses_ids
+            self._distance_matrix = np.array([[self.distances[i][j] for j in ids] for i in ids])
+        return self._distance_matrix
     
+    def share(self):
+        if self.shared is None:
+            from .libs.Shared import SharedArray
+            shared = self.package_table.share()
+            shared['distances'] = SharedArray(self.distance_matrix)
+            self.shared = shared
+
+        return {name: shared.handle for name, shared in self.shared.items()}
+
+    def unshare(self):
+        if self.shared is None:
+            return
+        for shared in self.shared.values():
+            shared.close()
+        self.shared = None
+
     def load_packages(self, filename = PACKAGES_FILENAME):
-        data = HashMap()
+        data = StateMap()
+        table = PackageTable()
         with open(PACKAGES_FILENAME) as csv_file:
             packages = csv.DictReader(csv_file, delimiter=',')
             for package in packages:
                 data.insert( 
                     key = int(package['id']), 
-                    value = Package(**package)
+                    value = Package(**package, table= table)
                 )
         
         self.packages = data
+        self.package_table = table
+
+    def load_constraints(self):
+        # Packages must be loaded before constraints
+        self.constraints = Constraints(self.packages)
 
     def load_trucks(self, filename = TRUCKS_FILENAME):
-        data = HashMap()
+        data = StateMap()
         with open(filename) as csv_file:
             trucks = csv.DictReader(csv_file, delimiter=',')
             for truck in trucks:
@@ -105,22 +285,79 @@ class WGUPS:
 
         self.trucks = data
 
+    def load_hubs(self, filename = HUBS_FILENAME):
+        self.hubs = Hubs.load(filename)
+        for truck in self.trucks.values():
+            if truck.hub_id not in self.hubs:
+                print(f'[Warning] {truck.id} hub {truck.hub_id} is not in {filename}')
+
+    def load_speeds(self, filename = SPEEDS_FILENAME):
+        self.speeds = SpeedProfile.load(filename)
+
     def load_routes(self, filename = ROUTES_FILENAME):
-        data = HashMap()
+        data = StateMap()
         with open(filename) as csv_file:
             routes = csv.DictReader(csv_file, delimiter=',',skipinitialspace=True)
             for route in routes:
-                route['start_time'] = data[route['start_after']].end_time + dtime(minutes= 1) if route['start_after'] != '' else dtime(route['start_time'])
+                # routes are solved lazily, a start_after route's start time is resolved when first needed
+                route['start_after'] = data[route['start_after']] if route['start_after'] != '' else None
+                route['start_time'] = None if route['start_after'] is not None else dtime(route['start_time'])
                 route['packages_ids'] = [] if route['packages_ids'] == '' else [int(id) for id in route['packages_ids'].split(';')]
-                route['start_address_id'] = HUB_ID if route['start_address_id'] == '' else int(route['start_address_id'])
+                route['start_address_id'] = None if route['start_address_id'] == '' else int(route['start_address_id'])
                 route['end_address_id'] = None if route['end_address_id'] == '' else int(route['end_address_id'])
                 route['round_trip'] = False if route['round_trip'] == 'False' else True
 
-                del route['start_after']
-
                 data.insert( 
                     key = route['id'], 
                     value = Route(**route)
                 )
 
-        self.routes = data
\ No newline at end of file
+        self.routes = data
+        self.hubs.check(self.routes.values())
+        if SOLVE_WORKERS > 1:
+            self.hubs.solve(self.routes.values(), SOLVE_WORKERS)
+
+    def load_index(self):
+        # Routes must be loaded before the index (package.route)
+        self.index = PackageIndex(self.packages.values())
+        self.package_table.index = self.index
+
+    def truck_position(self, truck_id, time = None):
+        from .data.Position import Position
+        time = self.time if time is None else time
+        finished = None
+        first = None
+        for route in self.routes.values():
+            if route.truck.id != truck_id:
+                continue
+            if route.start_time <= time <= route.end_time:
+                return route.position(time)
+            if route.end_time < time and (finished is None or route.end_time > finished.end_time):
+                finished = route
+            if time < route.start_time and (first is None or route.start_time < first.start_time):
+                first = route
+
+        route = finished if finished is not None else first
+        if route is None:
+            return Position(None, time, Position.Status.AT_HUB)
+        return route.position(time)
+
+    def snapshot(self):
+        if not isinstance(self.packages, PersistentHashMap):
+            raise TypeError(f"WGUPS.snapshot() requires STORAGE_BACKEND = 'persistent', not '{STORAGE_BACKEND}'")
+        return (self.time, self.packages.snapshot(), self.trucks.snapshot(), self.routes.snapshot())
+
+    def restore(self, snapshot):
+        time, packages, trucks, routes = snapshot
+        self.time = time
+        self.packages = packages.snapshot()
+        self.trucks = trucks.snapshot()
+        self.routes = routes.snapshot()
+        self.constraints.packages = self.packages
+        self.package_table.set_live([package.row for package in self.packages.values()])
+        for route in self.routes.values():
+            self.package_table.set_route(route)
+        for route in self.routes.values():
+            if route.solved:
+                route.finalize()
+        self.load_index()
\ No newline at end of file
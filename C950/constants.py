@@ -9,3 +9,24 @@ DISTANCES_FILENAME = 'distances.csv'
 PACKAGES_FILENAME = 'packages.csv'
 TRUCKS_FILENAME = 'trucks.csv'
 ROUTES_FILENAME = 'routes.csv'
+SPEEDS_FILENAME = 'speeds.csv'
+HUBS_FILENAME = 'hubs.csv'
+
+# replace distances with shortest path distances through other addresses (numpy required)
+METRIC_CLOSURE = True
+
+# tsp solver of every route (see TSP.Solver.create_solver()):
+# 'insertion', 'regret' (regret-k insertion), 'held_karp' (exact up to max_stops, numpy required) or 'ils' (iterated local search)
+TSP_SOLVER = 'insertion'
+# keyword arguments of the solver's constructor, eg: {'k': 3} for 'regret', {'budget': 0.5, 'gap': 0.01} for 'ils'
+TSP_SOLVER_OPTIONS = {}
+
+# containers: 'custom' (HashMap / HashSet), 'builtin' (dict / set, HashMap where order is used)
+# or 'persistent' (PersistentHashMap WGUPS state, enables WGUPS.snapshot() / restore()), see libs.Backend
+STORAGE_BACKEND = 'custom'
+
+# solve routes at load time, hubs in parallel worker processes when > 1 (see data.Hub)
+SOLVE_WORKERS = 1
+
+CACHE_DIRNAME = '.cache'
+CACHE_MAX_BYTES = 4 * 1024 * 1024
\ No newline at end of file
@@ -0,0 +1,108 @@
+import re
+from ..libs.Backend import Map
+from ..libs.DisjointSet import DisjointSet
+
+"""
+Constraint class - typed constraints of one package, parsed from its notes
+    package_id: int - package id
+    truck_id: str - the package can only be on this truck, None for any truck
+        eg: 'Can only be on truck 2' -> 'Truck 2'
+    group: list[int] - packages that must be delivered with this package
+        eg: 'Must be delivered with 13, 15' -> [13, 15]
+    available_time: int - time in seconds the package arrives at the hub, None if not delayed
+        eg: 'Delayed on flight---will not arrive to depot until 9:05 am' -> 9:05:00
+    address_time: int - time in seconds the package's address is corrected, None if the address is right
+        eg: 'Wrong address listed---fixed at 10:20' -> 10:20:00
+
+Constraints class - constraints of all packages, parsed and indexed once at load time
+    constraints: HashMap[int, Constraint] - only packages that have constraints
+    groups: DisjointSet - co-delivery groups, packages delivered with each other are in the same set
+    groups_routes: HashMap[int, Route] - group root -> route the group is assigned to
+
+    truck_id(package_id) -> str - O(1)
+    ready_time(package_id) -> int - time in seconds the package can leave the hub, O(1)
+        max of earliest, available_time and address_time
+    can_load(package_id, truck_id, time) -> bool - O(1) feasibility check of a package on a truck at a time
+    assign(package_id, route) -> Route - record the package's group on route, O(α(n))
+        returns the route the rest of the group is already on if it is another route, else None
+"""
+class Constraint:
+    TRUCK = re.compile(r'only be on truck (\w+)', re.IGNORECASE)
+    GROUP = re.compile(r'delivered with ([\d,\s]+)', re.IGNORECASE)
+    DELAYED = re.compile(r'delayed.*?(\d{1,2}):(\d{2})\s*(am|pm)?', re.IGNORECASE)
+    ADDRESS = re.compile(r'wrong address.*?(\d{1,2}):(\d{2})\s*(am|pm)?', re.IGNORECASE)
+
+    def __init__(self, package_id, notes):
+        self.package_id = package_id
+
+        match = Constraint.TRUCK.search(notes)
+        self.truck_id = f'Truck {match.group(1)}' if match else None
+
+        match = Constraint.GROUP.search(notes)
+        self.group = [int(id) for id in re.findall(r'\d+', match.group(1))] if match else []
+
+        self.available_time = Constraint.parse_time(Constraint.DELAYED.search(notes))
+        self.address_time = Constraint.parse_time(Constraint.ADDRESS.search(notes))
+
+    @staticmethod
+    def parse_time(match):
+        if match is None:
+            return None
+        hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3)
+        if meridiem is not None:
+            hour = hour % 12 + (12 if meridiem.lower() == 'pm' else 0)
+        return hour * 3600 + minute * 60
+
+    def __bool__(self):
+        return (self.truck_id is not None or len(self.group) > 0
+            or self.available_time is not None or self.address_time is not None)
+
+class Constraints:
+    def __init__(self, packages):
+        self.packages = packages
+        self.constraints = Map()
+        self.groups = DisjointSet()
+        self.groups_routes = Map()
+
+        for package in packages.values():
+            constraint = Constraint(package.id, package.notes)
+            if not constraint:
+                continue
+
+            self.constraints[package.id] = constraint
+            for package_id in constraint.group:
+                if package_id in packages:
+                    self.groups.union(package.id, package_id)
+
+    def __getitem__(self, package_id):
+        return self.constraints[package_id]
+
+    def truck_id(self, package_id):
+        constraint = self.constraints[package_id]
+        return None if constraint is None else constraint.truck_id
+
+    def ready_time(self, package_id):
+        time = self.packages[package_id].earliest
+        constraint = self.constraints[package_id]
+        if constraint is not None:
+            if constraint.available_time is not None and constraint.available_time > time:
+                time = constraint.available_time
+            if constraint.address_time is not None and constraint.address_time > time:
+                time = constraint.address_time
+        return time
+
+    def can_load(self, package_id, truck_id, time):
+        truck = self.truck_id(package_id)
+        return (truck is None or truck == truck_id) and self.ready_time(package_id) <= time
+
+    def assign(self, package_id, route):
+        if package_id not in self.groups:
+            return None
+
+        root = self.groups.find(package_id)
+        group_route = self.groups_routes[root]
+        if group_route is None:
+            self.groups_routes[root] = route
+        elif group_route is not route:
+            return group_route
+        return None
@@ -0,0 +1,157 @@
+import csv
+from multiprocessing import get_all_start_methods, get_context
+from concurrent.futures import ProcessPoolExecutor
+from ..libs.Backend import Map, OrderedMap
+from ..constants import HUB_ID
+
+"""
+Hub class - depot that trucks start from
+    address_id: int - hub address id, also the hub id (Truck.hub_id)
+    name: str - hub name
+    capacity: int - most packages the hub can take in an assignment, None for no limit
+
+Hubs class - hubs of the network, loaded from csv (a single hub at HUB_ID if there is no file)
+    hubs: HashMap[int, Hub] - address id -> Hub
+    the assignment is advisory only: routes are planned in routes.csv, and a route's hub is its truck's hub,
+        assign() does not move packages between routes, check() only reports where the two disagree
+
+    load(filename) -> Hubs - static
+    distances(packages_ids: list[int]) -> numpy.ndarray - distance from every package's address to every hub
+        one gather from wgups.distance_matrix, rows: packages, columns: hubs in hubs order (numpy required)
+    assign(packages_ids: list[int], balanced: bool = False) -> HashMap[int, int] - package id -> hub id
+        nearest: argmin over each row, vectorized
+        balanced: hubs' capacities are respected, packages that lose the most by not getting their nearest hub
+            (regret: second nearest - nearest distance) pick first, O(n * hubs) after the vectorized sort
+            packages that fit in no hub go to their nearest hub
+    partition(assignment: HashMap[int, int]) -> HashMap[int, list[int]] - hub id -> packages ids
+    check(routes: list[Route]) - warns about routed packages whose truck's hub is not the hub assign() gives them
+        routes are not changed, it is up to the routes' author to move the packages
+        balanced when any hub has a capacity, nothing to check (and no numpy) with a single hub
+
+    solve(routes: list[Route], workers: int) - solve routes grouped by their truck's hub, hubs in parallel
+        each hub is planned independently in a forked worker process (WGUPS state is inherited, not pickled),
+        workers send back stop orders only, routes are rebuilt from them like a cache hit (see TSP.Cache)
+        sequential with 1 worker, 1 hub, or where fork is not available
+"""
+class Hub:
+    def __init__(self, address_id, name, capacity = None):
+        self.address_id = int(address_id)
+        self.name = name
+        self.capacity = None if capacity in (None, '') else int(capacity)
+
+class Hubs:
+    def __init__(self, hubs):
+        from ..WGUPS import WGUPS
+        self.wgups = WGUPS.instance()
+        self.hubs = hubs
+
+    @staticmethod
+    def load(filename):
+        data = Map()
+        try:
+            with open(filename) as csv_file:
+                for hub in csv.DictReader(csv_file, delimiter=','):
+                    hub = Hub(**hub)
+                    data[hub.address_id] = hub
+        except FileNotFoundError:
+            data[HUB_ID] = Hub(HUB_ID, 'Hub')
+        return Hubs(data)
+
+    def __len__(self):
+        return len(self.hubs)
+
+    def __contains__(self, hub_id):
+        return hub_id in self.hubs
+
+    def __getitem__(self, hub_id):
+        return self.hubs[hub_id]
+
+    def distances(self, packages_ids):
+        import numpy as np
+        index = self.wgups.addresses_index
+        rows = [index[self.wgups.packages[id].address_id] for id in packages_ids]
+        columns = [index[hub_id] for hub_id in self.hubs.keys()]
+        return self.wgups.distance_matrix[np.ix_(rows, columns)]
+
+    def assign(self, packages_ids, balanced = False):
+        import numpy as np
+        packages_ids = list(packages_ids)
+        hubs_ids = list(self.hubs.keys())
+        D = self.distances(packages_ids)
+        ranks = np.argsort(D, axis=1, kind='stable')
+
+        if not balanced:
+            nearest = ranks[:, 0]
+        else:
+            nearest = ranks[:, 0].copy()
+            remaining = [float('inf') if hub.capacity is None else hub.capacity for hub in self.hubs.values()]
+            sorted_D = np.take_along_axis(D, ranks, axis=1)
+            regret = sorted_D[:, 1] - sorted_D[:, 0] if len(hubs_ids) > 1 else np.zeros(len(packages_ids))
+            for i in np.argsort(-regret, kind='stable').tolist():
+                for hub in ranks[i].tolist():
+                    if remaining[hub] > 0:
+                        remaining[hub] -= 1
+                        nearest[i] = hub
+                        break
+
+        data = Map()
+        for package_id, hub in zip(packages_ids, nearest.tolist()):
+            data[package_id] = hubs_ids[hub]
+        return data
+
+    def partition(self, assignment):
+        data = Map()
+        for package_id, hub_id in assignment.items():
+            if data[hub_id] is None:
+                data[hub_id] = []
+            data[hub_id].append(package_id)
+        return data
+
+    def check(self, routes):
+        if len(self.hubs) <= 1:
+            return
+
+        routed = Map()
+        for route in routes:
+            for package_id in route.packages_ids:
+                routed[package_id] = route.truck.hub_id
+        balanced = any(hub.capacity is not None for hub in self.hubs.values())
+        assignment = self.assign(routed.keys(), balanced)
+
+        for hub_id, packages_ids in self.partition(assignment).items():
+            farther = [id for id in packages_ids if routed[id] != hub_id]
+            if len(farther) > 0:
+                print(f'[Warning] packages {farther} are assigned to {self.hubs[hub_id].name} ({hub_id}) but routed from another hub')
+
+    def solve(self, routes, workers = 1):
+        groups = Map()
+        for route in routes:
+            if route.solved:
+                continue
+            if groups[route.truck.hub_id] is None:
+                groups[route.truck.hub_id] = []
+            groups[route.truck.hub_id].append(route.id)
+
+        if workers <= 1 or len(groups) <= 1 or 'fork' not in get_all_start_methods():
+            for routes_ids in groups.values():
+                solve_hub(routes_ids)
+            return
+
+        from .Route import Stop
+        with ProcessPoolExecutor(min(workers, len(groups)), mp_context=get_context('fork')) as pool:
+            for result in pool.map(solve_hub, list(groups.values())):
+                for route_id, stops in result:
+                    route = self.wgups.routes[route_id]
+                    route.stops = OrderedMap()
+                    for address_id, packages_ids in stops:
+                        route.stops[len(route.stops)] = Stop(route, packages_ids, address_id)
+                    route.finalize()
+
+def solve_hub(routes_ids):
+    from ..WGUPS import WGUPS
+    wgups = WGUPS.instance()
+    result = []
+    for route_id in routes_ids:
+        route = wgups.routes[route_id]
+        result.append((route_id, [(stop.address_id, stop.packages_ids) for stop in route.stops.values()]))
+    return result
@@ -1,25 +1,76 @@
 from enum import Enum
+from operator import index
 from ..libs.dtime import dtime
+from .PackageTable import PackageTable
 from ..constants import START_TIME, END_TIME
 
 """
-Package class
+Column class - descriptor that reads / writes a package's field in its PackageTable row
+    column: str - PackageTable column name
+    get: function(int) -> value - column value -> field value, None reads the int as is (the fast path)
+    set: function(value) -> int - field value -> column value
+    indexed: bool - changes are sent to the table's PackageIndex (see PackageIndex.update())
+
+Package class - light view onto a row of a PackageTable (table, row), the fields are stored in the table's columns
+    table: PackageTable - wgups.package_table, a new table of its own if not given
+    row: int - row in table
+    copy.copy(package) -> Package - copy on a new row, changing it does not change the original
+        the copy becomes the package's live row, the one the table's queries count (see PackageTable.copy_row())
     id: int - package id
     address_id: int - address id
-    earliest: dtime - earliest delivery time (when package arrives at hub)
-    latest: dtime - latest delivery time (delivery deadline)
+    earliest: int - earliest delivery time in seconds (when package arrives at hub)
+    latest: int - latest delivery time in seconds (delivery deadline)
     weight: int - package weight in kgs
     notes: str - package notes
-    status: Status - package status
+    status: Status - package status, see PackageTable for vectorized queries over all packages
 
     route: Route - route that this package is assigned to
-    departure_time: dtime - departure time from hub
-    delivery_time: dtime - delivery time
+    departure_time: int - departure time from hub in seconds, None if not scheduled
+    delivery_time: int - delivery time in seconds, None if not scheduled
+        both are filled in by the route's schedule (Route.aggregate()), reading them solves the route on demand
+    schedule() - schedule the package's route (Route.aggregate()), O(1) when the route is up to date
 
     info: str - package info
     str() -> str - alt package info representation
 """
+class Column:
+    def __init__(self, column, get = None, set = int, indexed = False):
+        self.column = column
+        self.get = get
+        self.set = set
+        self.indexed = indexed
+
+    def __get__(self, package, owner = None):
+        if package is None:
+            return self
+        value = getattr(package.table, self.column)[package.row]
+        return value if self.get is None else self.get(value)
+
+    def __set__(self, package, value):
+        column = getattr(package.table, self.column)
+        value = self.set(value)
+        old = column[package.row]
+        column[package.row] = value
+        if self.indexed and package.table.index is not None and old != value:
+            package.table.index.update(package, self.column, old, value)
+
+def get_time(seconds):
+    return None if seconds < 0 else seconds
+
+def set_time(time):
+    return -1 if time is None else index(time)
+
 class Package:
+    __slots__ = ('table', 'row')
+
+    id = Column('ids')
+    address_id = Column('address_ids', indexed= True)
+    weight = Column('weights')
+    earliest = Column('earliest', set= index)
+    latest = Column('latest', set= index, indexed= True)
+    _departure_time = Column('departures', get_time, set_time)
+    _delivery_time = Column('deliveries', get_time, set_time)
+
     class Status(Enum):
         IN_TRANSIT = 0
         AT_HUB = 1
@@ -29,18 +80,66 @@ class Package:
         def __str__(self):
             return self.name
 
-    def __init__(self, id, address_id, earliest, latest, weight, notes):
-        self.id = int(id)
-        self.address_id = int(address_id)
-        self.weight = int(weight)
-        self.notes = notes
+    def __init__(self, id, address_id, earliest, latest, weight, notes, table = None):
+        self.table = PackageTable() if table is None else table
+        self.row = self.table.append(
+            id = int(id),
+            address_id = int(address_id),
+            earliest = START_TIME if earliest == 'SOD' else dtime(earliest),
+            latest = END_TIME if latest == 'EOD' else dtime(latest),
+            weight = int(weight),
+            notes = notes
+        )
 
-        self.earliest = START_TIME if earliest == 'SOD' else dtime(earliest)
-        self.latest = END_TIME if latest == 'EOD' else dtime(latest)
-        
-        self.departure_time = None
-        self.delivery_time = None
-        self.route = None
+    def __copy__(self):
+        copy = object.__new__(Package)
+        copy.table = self.table
+        copy.row = self.table.copy_row(self.row)
+        return copy
+
+    @property
+    def notes(self):
+        return self.table.notes[self.row]
+
+    @notes.setter
+    def notes(self, notes):
+        self.table.notes[self.row] = notes
+
+    @property
+    def route(self):
+        i = self.table.routes_ids[self.row]
+        return None if i < 0 else self.table.routes[i]
+
+    @route.setter
+    def route(self, route):
+        old = self.table.routes_ids[self.row]
+        new = self.table.route_index(route)
+        self.table.routes_ids[self.row] = new
+        if self.table.index is not None and old != new:
+            self.table.index.update(self, 'routes_ids', old, new)
+
+    def schedule(self):
+        i = self.table.routes_ids[self.row]
+        if i >= 0:
+            self.table.routes[i].aggregate()
+
+    @property
+    def departure_time(self):
+        self.schedule()
+        return self._departure_time
+
+    @departure_time.setter
+    def departure_time(self, departure_time):
+        self._departure_time = departure_time
+
+    @property
+    def delivery_time(self):
+        self.schedule()
+        return self._delivery_time
+
+    @delivery_time.setter
+    def delivery_time(self, delivery_time):
+        self._delivery_time = delivery_time
 
     @property
     def info(self):
@@ -48,9 +147,9 @@ class Package:
         wgups = WGUPS.instance()
         address = wgups.addresses[self.address_id]
 
-        info = f'Package {self.id}: [{str(self.status)}] - {address.full_addr} - {self.weight} kgs - deadline: {self.latest}'
+        info = f'Package {self.id}: [{str(self.status)}] - {address.full_addr} - {self.weight} kgs - deadline: {dtime(seconds= self.latest)}'
         if self.route is not None:
-            info += f'\r\n\t{self.route.id}: {self.route.truck.id} - Departure Time: {self.departure_time} - Delivery Time: {self.delivery_time}'
+            info += f'\r\n\t{self.route.id}: {self.route.truck.id} - Departure Time: {dtime(seconds= self.departure_time)} - Delivery Time: {dtime(seconds= self.delivery_time)}'
             if self.delivery_time > self.latest:
                 info += '\r\n\t[Warning] Late delivery'
         else:
@@ -62,7 +161,7 @@ class Package:
         return info
 
     def __str__(self):
-        return f'P[{self.id}]: A[{self.address_id}] - {self.earliest} to {self.latest} - {self.weight} kgs - {self.notes}'
+        return f'P[{self.id}]: A[{self.address_id}] - {dtime(seconds= self.earliest)} to {dtime(seconds= self.latest)} - {self.weight} kgs - {self.notes}'
 
     @property
     def status(self):
@@ -70,11 +169,16 @@ class Package:
         wgups = WGUPS.instance()
         time = wgups.time
 
-        if self.delivery_time is not None and self.delivery_time <= time:
+        # status sweeps read every package, the row's columns are read directly (-1: not scheduled)
+        table, row = self.table, self.row
+        i = table.routes_ids[row]
+        if i >= 0:
+            table.routes[i].aggregate()
+        if 0 <= table.deliveries[row] <= time:
             return Package.Status.DELIVERED
-        elif self.departure_time is not None and self.departure_time <= time:
+        elif 0 <= table.departures[row] <= time:
             return Package.Status.EN_ROUTED
-        elif self.earliest <= time:
+        elif table.earliest[row] <= time:
             return Package.Status.AT_HUB
         else:
-            return Package.Status.IN_TRANSIT
\ No newline at end of file
+            return Package.Status.IN_TRANSIT
\ No newline at end of file
@@ -0,0 +1,136 @@
+from ..libs.Backend import Map, OrderedMap
+
+"""
+PackageIndex class - secondary indexes of packages, built once at load time (WGUPS.load_index())
+    every index maps a key to a list of packages ids (in the order packages were added, do not modify the lists)
+    addresses: HashMap[int, list[int]] - address id -> packages ids
+    deadlines: HashMap[int, list[int]] - deadline (latest, seconds) -> packages ids, ordered by deadline
+    routes: HashMap[str, list[int]] - route id -> packages ids
+    trucks: HashMap[str, list[int]] - truck id -> packages ids
+    zip_codes: HashMap[str, list[int]] - zip code -> packages ids
+    cities: HashMap[str, list[int]] - city -> packages ids
+
+    add(package) / remove(package) - O(log n) per index (+ O(k) list removal)
+    update(package, column, old, new) - called by the package's table when an indexed column changes
+        (address_ids, latest, routes_ids, see Package.Column), so the indexes follow package changes
+
+    lookups, O(1) unless noted:
+        address(address_id) -> list[int]
+        route(route_id) -> list[int]
+        truck(truck_id) -> list[int]
+        zip_code(zip_code) -> list[int]
+        city(city) -> list[int]
+        due_by(time: int) -> list[int] - packages with latest <= time, O(log n + k) (range query, see BST.range())
+        due_between(start: int, end: int) -> list[int] - packages with start <= latest <= end, O(log n + k)
+"""
+class PackageIndex:
+    def __init__(self, packages = []):
+        from ..WGUPS import WGUPS
+        self.wgups = WGUPS.instance()
+        self.addresses = Map()
+        self.deadlines = OrderedMap()
+        self.routes = Map()
+        self.trucks = Map()
+        self.zip_codes = Map()
+        self.cities = Map()
+
+        for package in packages:
+            self.add(package)
+
+    @staticmethod
+    def _add(data, key, package_id):
+        if key is None:
+            return
+        ids = data[key]
+        if ids is None:
+            data[key] = [package_id]
+        else:
+            ids.append(package_id)
+
+    @staticmethod
+    def _remove(data, key, package_id):
+        ids = data[key]
+        if ids is None or package_id not in ids:
+            return
+        ids.remove(package_id)
+        if len(ids) == 0:
+            data.remove(key)
+
+    def _address_keys(self, address_id):
+        address = self.wgups.addresses[address_id]
+        if address is None:
+            return None, None
+        return address.zip_code, address.city
+
+    def _route_keys(self, route):
+        if route is None:
+            return None, None
+        return route.id, route.truck.id
+
+    def add(self, package):
+        self._add_address(package.id, package.address_id)
+        self._add(self.deadlines, package.latest, package.id)
+        self._add_route(package.id, package.route)
+
+    def remove(self, package):
+        zip_code, city = self._address_keys(package.address_id)
+        route_id, truck_id = self._route_keys(package.route)
+        self._remove(self.addresses, package.address_id, package.id)
+        self._remove(self.zip_codes, zip_code, package.id)
+        self._remove(self.cities, city, package.id)
+        self._remove(self.deadlines, package.latest, package.id)
+        self._remove(self.routes, route_id, package.id)
+        self._remove(self.trucks, truck_id, package.id)
+
+    def _add_address(self, package_id, address_id):
+        zip_code, city = self._address_keys(address_id)
+        self._add(self.addresses, address_id, package_id)
+        self._add(self.zip_codes, zip_code, package_id)
+        self._add(self.cities, city, package_id)
+
+    def _add_route(self, package_id, route):
+        route_id, truck_id = self._route_keys(route)
+        self._add(self.routes, route_id, package_id)
+        self._add(self.trucks, truck_id, package_id)
+
+    def update(self, package, column, old, new):
+        if column == 'address_ids':
+            zip_code, city = self._address_keys(old)
+            self._remove(self.addresses, old, package.id)
+            self._remove(self.zip_codes, zip_code, package.id)
+            self._remove(self.cities, city, package.id)
+            self._add_address(package.id, new)
+        elif column == 'latest':
+            self._remove(self.deadlines, old, package.id)
+            self._add(self.deadlines, new, package.id)
+        elif column == 'routes_ids':
+            routes = package.table.routes
+            route_id, truck_id = self._route_keys(routes[old] if old >= 0 else None)
+            self._remove(self.routes, route_id, package.id)
+            self._remove(self.trucks, truck_id, package.id)
+            self._add_route(package.id, routes[new] if new >= 0 else None)
+
+    def address(self, address_id):
+        return self.addresses[address_id] or []
+
+    def route(self, route_id):
+        return self.routes[route_id] or []
+
+    def truck(self, truck_id):
+        return self.trucks[truck_id] or []
+
+    def zip_code(self, zip_code):
+        return self.zip_codes[zip_code] or []
+
+    def city(self, city):
+        return self.cities[city] or []
+
+    def due_by(self, time):
+        return self.due_between(None, time)
+
+    def due_between(self, start, end):
+        ids = []
+        # deadlines are whole seconds, so latest <= end is latest < end + 1
+        for node in self.deadlines.range(start, end + 1):
+            ids.extend(node.value)
+        return ids
@@ -0,0 +1,142 @@
+from array import array
+from operator import index
+from ..libs.Backend import Map
+
+"""
+PackageTable class - packages' fields in typed columns (struct of arrays), one row per package
+    columns: array('i') - 4 bytes per package per column, times in seconds since midnight
+        ids, address_ids, weights, earliest, latest
+        departures, deliveries: -1 until the package's route is scheduled (see Route.aggregate())
+        routes_ids: index in routes, -1 if the package is not assigned to any route
+        live: 1 for the package's live row, 0 for a row superseded by a copy (see copy_row())
+    notes: list[str]
+    routes: list[Route] - routes that packages are assigned to, one per route id
+        a route's copy takes its place, so packages resolve to the current branch's route (see Route.__copy__())
+    routes_index: HashMap[str, int] - route id -> index in routes
+    index: PackageIndex - secondary indexes kept up to date on package changes, None if not built
+
+    append(id, address_id, earliest, latest, weight, notes) -> int - new row, O(1) amortized
+    copy_row(row: int) -> int - new row with the same fields, it becomes the package's live row
+        the copied row is kept (a snapshot may still use it, see WGUPS.restore()), but it is no longer live
+    set_live(rows: list[int]) - make rows the live rows, one per package, eg: after restoring a snapshot
+    route_index(route: Route) -> int - index of route in routes, added on first use (-1 for None)
+    set_route(route: Route) - make route the one its id resolves to, eg: a copy or a restored route
+    column(name: str) -> numpy.ndarray - zero-copy view of a column (numpy required)
+        the view pins the column's buffer, appending rows while a view is alive raises BufferError
+    share() -> HashMap[str, SharedArray] - column name -> copy of the column in shared memory (see libs.Shared)
+    attach(handles: dict[str, tuple]) -> PackageTable - static, read-only table over shared columns, no copy
+        for worker processes: columns are memoryviews, column() and the vectorized queries work,
+        notes and routes are not shared, rows cannot be appended, column() views are made by Shared.array()
+
+    schedule() - schedule every route (Route.aggregate()), fills in departures and deliveries
+    vectorized queries (numpy required) over live rows, routes are scheduled first:
+        late_packages_ids() -> list[int] - packages delivered after their deadline
+        weight_per_route() -> HashMap[str, int] - route id -> total weight of its packages
+        delivered_between(start: int, end: int) -> list[int] - packages delivered at start <= time <= end
+"""
+class PackageTable:
+    COLUMNS = ('ids', 'address_ids', 'weights', 'earliest', 'latest', 'departures', 'deliveries', 'routes_ids', 'live')
+
+    def __init__(self):
+        for name in PackageTable.COLUMNS:
+            setattr(self, name, array('i'))
+        self.notes = []
+        self.routes = []
+        self.routes_index = Map()
+        self.index = None
+        self.handles = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, id, address_id, earliest, latest, weight, notes):
+        row = len(self.ids)
+        self.ids.append(id)
+        self.address_ids.append(address_id)
+        self.weights.append(weight)
+        self.earliest.append(index(earliest))
+        self.latest.append(index(latest))
+        self.departures.append(-1)
+        self.deliveries.append(-1)
+        self.routes_ids.append(-1)
+        self.live.append(1)
+        self.notes.append(notes)
+        return row
+
+    def copy_row(self, row):
+        copy = self.append(self.ids[row], self.address_ids[row], self.earliest[row], self.latest[row],
+            self.weights[row], self.notes[row])
+        self.departures[copy] = self.departures[row]
+        self.deliveries[copy] = self.deliveries[row]
+        self.routes_ids[copy] = self.routes_ids[row]
+        self.live[row] = 0
+        return copy
+
+    def set_live(self, rows):
+        for row in range(len(self.live)):
+            self.live[row] = 0
+        for row in rows:
+            self.live[row] = 1
+
+    def route_index(self, route):
+        if route is None:
+            return -1
+        i = self.routes_index[route.id]
+        if i is None:
+            i = len(self.routes)
+            self.routes.append(route)
+            self.routes_index[route.id] = i
+        return i
+
+    def set_route(self, route):
+        self.routes[self.route_index(route)] = route
+
+    def column(self, name):
+        if self.handles is not None:
+            from ..libs.Shared import array
+            return array(self.handles[name])
+        import numpy as np
+        return np.frombuffer(getattr(self, name), dtype=np.intc)
+
+    def share(self):
+        from ..libs.Shared import SharedArray
+        data = Map()
+        for name in PackageTable.COLUMNS:
+            data[name] = SharedArray(getattr(self, name))
+        return data
+
+    @staticmethod
+    def attach(handles):
+        from ..libs.Shared import attach
+        table = PackageTable()
+        for name in PackageTable.COLUMNS:
+            setattr(table, name, attach(handles[name]))
+        table.handles = handles
+        return table
+
+    def schedule(self):
+        for route in self.routes:
+            route.aggregate()
+
+    def late_packages_ids(self):
+        self.schedule()
+        deliveries = self.column('deliveries')
+        late = (self.column('live') == 1) & (deliveries >= 0) & (deliveries > self.column('latest'))
+        return self.column('ids')[late].tolist()
+
+    def weight_per_route(self):
+        import numpy as np
+        routes_ids = self.column('routes_ids')
+        assigned = (self.column('live') == 1) & (routes_ids >= 0)
+        weights = np.bincount(routes_ids[assigned], weights=self.column('weights')[assigned], minlength=len(self.routes))
+
+        data = Map()
+        for route, weight in zip(self.routes, weights.tolist()):
+            data[route.id] = int(weight)
+        return data
+
+    def delivered_between(self, start, end):
+        self.schedule()
+        deliveries = self.column('deliveries')
+        between = (self.column('live') == 1) & (deliveries >= 0) & (deliveries >= index(start)) & (deliveries <= index(end))
+        return self.column('ids')[between].tolist()
@@ -0,0 +1,51 @@
+from enum import Enum
+from ..libs.dtime import dtime
+
+"""
+Position class - where a truck is on a route at a time (see Route.position() and WGUPS.truck_position())
+    route: Route - route the truck is on, None if the truck has no route
+    time: int - query time in seconds
+    status: Status - AT_HUB before the route starts, EN_ROUTE while driving, FINISHED after the last stop
+    last_stop: Stop - last stop reached, None before the route starts
+    next_stop: Stop - next stop to reach, None after the last stop
+    progress: float - fraction of the leg from last_stop to next_stop driven, 0 at a stop
+    eta: int - seconds until next_stop is reached, 0 after the last stop
+    remaining: int - seconds until the end of the route, 0 after the last stop
+
+    __str__() -> str - position info
+"""
+class Position:
+    class Status(Enum):
+        AT_HUB = 0
+        EN_ROUTE = 1
+        FINISHED = 2
+
+        def __str__(self):
+            return self.name
+
+    def __init__(self, route, time, status, last_stop = None, next_stop = None, progress = 0.0, eta = 0, remaining = 0):
+        self.route = route
+        self.time = time
+        self.status = status
+        self.last_stop = last_stop
+        self.next_stop = next_stop
+        self.progress = progress
+        self.eta = eta
+        self.remaining = remaining
+
+    def __str__(self):
+        from ..WGUPS import WGUPS
+        wgups = WGUPS.instance()
+        if self.route is None:
+            return f'[{str(self.status)}] no route'
+
+        s = f'[{str(self.status)}] {self.route.id}'
+        if self.last_stop is not None:
+            s += f' - last stop: {wgups.addresses[self.last_stop.address_id].addr} at {dtime(seconds= self.last_stop.time)}'
+        if self.status == Position.Status.AT_HUB:
+            s += f' - starts in {dtime(seconds= self.eta)}'
+        elif self.next_stop is not None:
+            s += f' - next stop: {wgups.addresses[self.next_stop.address_id].addr} in {dtime(seconds= self.eta)} ({self.progress:.0%} of the leg)'
+        if self.status != Position.Status.FINISHED:
+            s += f' - route ends in {dtime(seconds= self.remaining)}'
+        return s
@@ -1,6 +1,8 @@
+import copy
+from bisect import bisect_right
 from ..libs.dtime import dtime
-from ..libs.Hash import HashMap
-from ..constants import START_TIME, END_TIME, HUB_ID
+from ..libs.Backend import Map, OrderedMap
+from ..constants import START_TIME, END_TIME
 
 """
 Stop class - only used by Route class
@@ -10,11 +12,12 @@ Stop class - only used by Route class
     owner: HashNode - used by route.stops: HashMap to keep track of the stop's position in the route
         (see Hash.HashMap.insert() and Hash.HashMap.remove())
 
-    earliest: dtime - earliest delivery time
-    latest: dtime - latest delivery time
+    earliest: int - earliest delivery time in seconds
+    latest: int - latest delivery time in seconds
     
     distance: float - distance from beginning of route to this stop
-    time: dtime - time when truck arrives at this stop
+    time: int - time in seconds when truck arrives at this stop
+        both are read from the route's aggregates (see Route.aggregate())
 
     __str__() -> str - stop info
 """
@@ -24,6 +27,8 @@ class Stop:
         self.packages_ids = packages_ids
         self.address_id = address_id
         self.owner = None
+        self._distance = 0
+        self._time = None
         
         if len(self.packages_ids) > 0:
             from ..WGUPS import WGUPS
@@ -31,24 +36,18 @@ class Stop:
             self.earliest = max([wgups.packages[id].earliest for id in self.packages_ids])
             self.latest = min([wgups.packages[id].latest for id in self.packages_ids])
         else:
-            self.earliest = START_TIME
-            self.latest = END_TIME
+            self.earliest = int(START_TIME)
+            self.latest = int(END_TIME)
 
     @property
     def distance(self):
-        if self.owner is not None and self.owner.prev is not None:
-            from ..WGUPS import WGUPS
-            wgups = WGUPS.instance()
-            prev = self.owner.prev.value
-            distance = prev.distance + wgups.distances[prev.address_id][self.address_id]
-            return round(distance, 1)
-        else:
-            return 0
+        self.route.aggregate()
+        return self._distance
         
     @property
     def time(self):
-        t = self.distance / self.route.truck.speed
-        return self.route.start_time + dtime(hours = t)
+        self.route.aggregate()
+        return self.route.start_time if self._time is None else self._time
     
     def __str__(self):
         pkgs = ''
@@ -60,7 +59,7 @@ class Stop:
             status = 'On Time' if t <= package.latest else 'Late'
             pkgs += f'\r\n\t[{status}] {str(package)}'
         addr = wgups.addresses[self.address_id]
-        return f'{str(addr)} - {self.distance}mi - {self.time} {pkgs}'
+        return f'{str(addr)} - {self.distance}mi - {dtime(seconds= t)} {pkgs}'
 
 """
 Route class
@@ -68,92 +67,295 @@ Route class
     truck: Truck - truck ref
     packages_ids: list[int] - list of package ids
     late_packages_ids: list[int] - list of late packages ids
+    weight: int - total weight of route's packages in kgs
     stops: HashMap[int, Stop] - list of stops in route, key: int is stop's position in route
-    tsp: TSP - tsp solver, default: Insertion
+    tsp: Solver - tsp solver, default: TSP_SOLVER with TSP_SOLVER_OPTIONS (see TSP.Solver.create_solver())
+        its identity() is part of the cache key, so routes cached by another solver are solved again
+    cache: Cache - solved routes cache, None to always solve
 
-    start_time: dtime - start time of route
-    end_time: dtime - end time of route
-    start_address_id: int - start address id
+    start_time: int - start time of route in seconds
+    end_time: int - end time of route in seconds
+    start_address_id: int - start address id, default: the truck's hub
     round_trip: bool - if route is round trip
     end_address_id: int - end address id, if round_trip is True then ignore this
     distance: float - total distance of route
+    lower_bound: float - lower bound on the shortest possible distance for the route's stops, None without numpy
+        cached until route.stops change (see TSP.Bound)
+    gap: float - optimality gap (distance - lower_bound) / lower_bound, None if unknown
     plot_color: str - plot color for drawing route
         eg: 'r': red, 'g': green, 'b': blue, 'm': magenta ...
 
+    start_after: Route - route that must finish before this route starts, start_time is resolved on demand
+        and follows start_after's end_time when it changes
+        resolved through the package table (see PackageTable.routes), so it follows a copy of start_after
+    solved: bool - if route has been solved
+
     initialize() - set up route
     solve() - use tsp solver to solve route
+        solving is deferred until stops, distance, end_time or late_packages_ids are first needed
+        on a cache hit the tsp solver is skipped and stops are rehydrated from the cache
     finalize() - finalize route after solving
+    aggregate() - one pass over stops to compute distance, end_time, late_packages_ids, weight,
+        every stop's distance / time and every package's departure / delivery time
+        travel times follow wgups.speeds per time of day, constant truck speed is the fast path
+        the result is cached until route.stops is replaced or modified (HashMap.version) or start_time changes,
+        so distance, end_time, late_packages_ids and weight are O(1) after the first read
+        the cache check is a dirty flag and a version compare, start_after's end_time is only compared when chained
+
+    arrivals: list[int] - arrival time in seconds at every stop in order (sorted), filled in by aggregate()
+    position(time: int) -> Position - where the truck is on the route at a time, bisect over arrivals O(log n)
+    eta(address_id: int, time: int) -> int - seconds from time until the stop at address_id is reached,
+        0 if it is already reached, None if the route does not stop there, O(1)
 
     set_start_time() - set start time of route
-        if input start_time is earlier than earliest delivery time of packages then auto adjust start time
+        if input start_time is earlier than the time all packages are ready (see Constraints.ready_time())
+        then auto adjust start time
     set_packages_ids() - set packages ids of route
+        warns about packages that break a truck restriction or a co-delivery group (see Constraints)
+
+    copy.copy(route) -> Route - copy on write, to change a route in a snapshot branch (see WGUPS.snapshot())
+        the copy has its own stops and aggregates, O(stops), the rest is shared
+        the copy becomes the route its packages and the routes starting after it resolve to (see PackageTable.set_route())
+        eg: route = copy.copy(wgups.routes['Route 1A']); route.set_start_time(...); wgups.routes[route.id] = route
 """
 class Route:
-    def __init__(self, id, truck_id, start_time, packages_ids = [], start_address_id = HUB_ID, round_trip = True, end_address_id = None, plot_color = 'r'):
-        self.initialize(id, truck_id, start_time, packages_ids, start_address_id, round_trip, end_address_id, plot_color)
-        self.solve()
+    def __init__(self, id, truck_id, start_time, packages_ids = [], start_address_id = None, round_trip = True, end_address_id = None, plot_color = 'r', start_after = None, tsp = None):
+        self.initialize(id, truck_id, start_time, packages_ids, start_address_id, round_trip, end_address_id, plot_color, start_after, tsp)
 
 
-    def initialize(self, id, truck_id, start_time, packages_ids, start_address_id, round_trip, end_address_id, plot_color):
-        from ..TSP.Hueristic.Insertion import Insertion
+    def initialize(self, id, truck_id, start_time, packages_ids, start_address_id, round_trip, end_address_id, plot_color, start_after = None, tsp = None):
+        from ..TSP.Solver import create_solver
+        from ..TSP.Cache import Cache
         from ..WGUPS import WGUPS
         self.wgups = WGUPS.instance()
         self.id = id
-        self.tsp = Insertion()
+        self.tsp = create_solver() if tsp is None else tsp
+        self.cache = Cache.instance()
         self.truck = self.wgups.trucks[truck_id]
+        self._stops = None
+        self._start_time = None
+        self._start_after_end_time = None
+        self._dirty = True
+        self._stops_version = None
+        self._bound_key = None
+        self._start_after = self.wgups.package_table.route_index(start_after)
         self.set_packages_ids(packages_ids)
-        self.set_start_time(start_time)
-        self.start_address_id = start_address_id
+        if start_after is None:
+            self.set_start_time(start_time)
+        self.start_address_id = self.truck.hub_id if start_address_id is None else start_address_id
         self.round_trip = round_trip
         self.end_address_id = self.start_address_id if round_trip else end_address_id
         self.plot_color = plot_color
 
+    def __copy__(self):
+        route = object.__new__(Route)
+        route.__dict__.update(self.__dict__)
+        route.packages_ids = list(self.packages_ids)
+        route._dirty = True
+        route._bound_key = None
+        if self._stops is not None:
+            route._stops = OrderedMap()
+            for key, stop in self._stops.items():
+                stop = copy.copy(stop)
+                stop.route = route
+                stop.owner = None
+                route._stops[key] = stop
+        self.wgups.package_table.set_route(route)
+        return route
+
+    @property
+    def start_after(self):
+        i = self._start_after
+        return None if i < 0 else self.wgups.package_table.routes[i]
+
     def finalize(self):
-        self.late_packages_ids = []
-        for stop in self.stops.values():
+        self._dirty = True
+        self.aggregate()
+
+    def aggregate(self):
+        start_after = self.start_after
+        if start_after is not None and start_after.end_time != self._start_after_end_time:
+            self._dirty = True
+        if not self._dirty and self._stops.version == self._stops_version:
+            return
+
+        stops = self.stops
+        start_time = self.start_time
+
+        speed = self.truck.speed
+        speeds = self.wgups.speeds
+        distance = 0
+        weight = 0
+        late_packages_ids = []
+        arrivals = []
+        stops_list = []
+        arrivals_index = Map()
+        prev = None
+        for stop in stops.values():
+            if prev is None:
+                time = start_time
+            else:
+                leg = self.wgups.distances[prev.address_id][stop.address_id]
+                distance = round(distance + leg, 1)
+                if speeds.constant:
+                    time = start_time + round(distance * 3600 / speed)
+                else:
+                    time += speeds.travel_time(leg, time, speed)
+            stop._distance = distance
+            stop._time = time
+            arrivals.append(time)
+            stops_list.append(stop)
+            if arrivals_index[stop.address_id] is None:
+                arrivals_index[stop.address_id] = time
+
             for package_id in stop.packages_ids:
                 package = self.wgups.packages[package_id]
-                package.departure_time = self.start_time
-                package.delivery_time = stop.time
-            if stop.latest < stop.time:
-                self.late_packages_ids.append(package_id)
+                package.departure_time = start_time
+                package.delivery_time = time
+                weight += package.weight
+                if package.latest < time:
+                    late_packages_ids.append(package_id)
+            prev = stop
+
+        self._distance = distance
+        self._end_time = start_time if prev is None else time
+        self._weight = weight
+        self._late_packages_ids = late_packages_ids
+        self._arrivals = arrivals
+        self._stops_list = stops_list
+        self._arrivals_index = arrivals_index
+        self._stops_version = stops.version
+        self._dirty = False
+
+    @property
+    def arrivals(self):
+        self.aggregate()
+        return self._arrivals
+
+    def position(self, time):
+        from .Position import Position
+        arrivals = self.arrivals
+        stops = self._stops_list
+        end_time = self._end_time
+        i = bisect_right(arrivals, time) - 1
+        if i < 0:
+            next_time = arrivals[0] if len(arrivals) > 0 else self.start_time
+            return Position(self, time, Position.Status.AT_HUB, None, stops[0] if len(stops) > 0 else None,
+                eta= next_time - time, remaining= end_time - time)
+        if i == len(arrivals) - 1:
+            return Position(self, time, Position.Status.FINISHED, stops[i], None)
+
+        leg = arrivals[i + 1] - arrivals[i]
+        progress = (time - arrivals[i]) / leg if leg > 0 else 1.0
+        return Position(self, time, Position.Status.EN_ROUTE, stops[i], stops[i + 1],
+            progress= progress, eta= arrivals[i + 1] - time, remaining= end_time - time)
+
+    def eta(self, address_id, time):
+        self.aggregate()
+        arrival = self._arrivals_index[address_id]
+        if arrival is None:
+            return None
+        return max(arrival - time, 0)
 
     def solve(self):
-        self.stops = HashMap()
-        self.tsp.solve(self)
+        self.stops = OrderedMap()
+        if self.cache is None or not self.cache.load(self):
+            self.tsp.solve(self)
+            if self.cache is not None:
+                self.cache.save(self)
         self.finalize()
 
     def __str__(self):
         s = f'[{self.id}]\r\n'
         s += f'\t{self.truck.id}\r\n'
-        s += f'\tStart Time: {self.start_time} - End Time: {self.end_time}\r\n'
-        s += f'\tDistance: {self.distance} miles\r\n'
-        s += f'\tPackages: {len(self.packages_ids)}\r\n'
+        s += f'\tStart Time: {dtime(seconds= self.start_time)} - End Time: {dtime(seconds= self.end_time)}\r\n'
+        gap = self.gap
+        s += f'\tDistance: {self.distance} miles' + ('' if gap is None else f' (lower bound: {self.lower_bound:.1f} miles, gap: {gap:.1%})') + '\r\n'
+        s += f'\tPackages: {len(self.packages_ids)} ({self.weight} kgs)\r\n'
         s += f'\tLate Packages: {len(self.late_packages_ids)}\r\n'
         s += f'\tStops: {len(self.stops)}\r\n'
         for stop in self.stops.values():
             s += f'{str(stop)}\r\n'
         return s
 
+    @property
+    def solved(self):
+        return self._stops is not None
+
+    @property
+    def stops(self):
+        if self._stops is None:
+            self.solve()
+        return self._stops
+
+    @stops.setter
+    def stops(self, stops):
+        self._stops = stops
+        self._dirty = True
+
+    @property
+    def late_packages_ids(self):
+        self.aggregate()
+        return self._late_packages_ids
+
+    @property
+    def weight(self):
+        self.aggregate()
+        return self._weight
+
+    @property
+    def start_time(self):
+        start_after = self.start_after
+        if start_after is not None:
+            # start_after's end_time is cached, so following it costs O(1) per read
+            end_time = start_after.end_time
+            if end_time != self._start_after_end_time:
+                self._start_after_end_time = end_time
+                self.set_start_time(end_time + 60)
+        return self._start_time
+
     @property
     def distance(self):
-        return self.stops.end.value.distance
+        self.aggregate()
+        return self._distance
     
+    @property
+    def lower_bound(self):
+        stops = self.stops
+        key = (stops, stops.version)
+        if self._bound_key != key:
+            try:
+                from ..TSP.Bound import Bound
+            except ImportError:
+                return None
+            self._lower_bound = Bound().lower_bound(self, self.distance)
+            self._bound_key = key
+        return self._lower_bound
+
+    @property
+    def gap(self):
+        lower_bound = self.lower_bound
+        if lower_bound is None or lower_bound <= 0:
+            return None
+        return max(self.distance - lower_bound, 0) / lower_bound
+
     @property
     def end_time(self):
-        return self.stops.end.value.time
+        self.aggregate()
+        return self._end_time
     
     def set_start_time(self, start_time):
-        earliest_start_time = max([self.wgups.packages[id].earliest for id in self.packages_ids])
+        earliest_start_time = max([self.wgups.constraints.ready_time(id) for id in self.packages_ids])
         if start_time is None:
-            self.start_time = earliest_start_time
+            self._start_time = earliest_start_time
         elif start_time < earliest_start_time:
-            new_start_time = earliest_start_time + dtime(minutes= 1)
-            print(f'[Warning] {self.id} {self.truck.id} Start time cannot be earlier than {earliest_start_time}')
-            print(f'\tAuto adjusting start time from {start_time} to {new_start_time}')
-            self.start_time = new_start_time
+            new_start_time = earliest_start_time + 60
+            print(f'[Warning] {self.id} {self.truck.id} Start time cannot be earlier than {dtime(seconds= earliest_start_time)}')
+            print(f'\tAuto adjusting start time from {dtime(seconds= start_time)} to {dtime(seconds= new_start_time)}')
+            self._start_time = new_start_time
         else:
-            self.start_time = start_time
+            self._start_time = int(start_time)
+        self._dirty = True
 
     def set_packages_ids(self, packages_ids):
         self.packages_ids = []
@@ -162,6 +364,13 @@ class Route:
             if package.route is None:
                 self.packages_ids.append(package_id)
                 package.route = self
+
+                truck_id = self.wgups.constraints.truck_id(package_id)
+                if truck_id is not None and truck_id != self.truck.id:
+                    print(f'[Warning] {self.id} {self.truck.id} Package {package_id} can only be on {truck_id}')
+                group_route = self.wgups.constraints.assign(package_id, self)
+                if group_route is not None:
+                    print(f'[Warning] {self.id} {self.truck.id} Package {package_id} must be delivered with packages on {group_route.id}')
             else:
                 print(f'[{self.truck.id} Route] Package {package_id} is already on a route')
-    
\ No newline at end of file
+    
\ No newline at end of file
@@ -0,0 +1,70 @@
+import csv
+from ..libs.dtime import dtime
+from ..libs.Backend import Map
+
+"""
+SpeedProfile class - truck speed factor per time of day bucket, loaded from csv
+    starts: list[int] - bucket start times in seconds, sorted, a bucket lasts until the next one starts
+    factors: list[float] - speed factor per bucket, truck speed * factor is the speed in the bucket
+        eg: 0.6 in the morning rush hour, 1.0 otherwise
+        times before the first bucket use factor 1.0
+    buckets: list[int] - bucket index per minute of the day, so finding a time's bucket is O(1)
+    constant: bool - if every factor is 1.0, callers then use the constant speed fast path
+
+    bucket(time: int) -> int - bucket index of a time in seconds
+    factor(time: int) -> float - speed factor at a time in seconds
+    travel_time(distance: float, depart: int, speed: float) -> int - seconds to drive distance leaving at depart
+        the whole leg is driven at the speed of the departure bucket
+    tables(D: numpy.ndarray, speed: float) -> numpy.ndarray - travel seconds T[bucket, i, j] for every bucket,
+        precomputed once per truck speed (cached), O(1) lookups for solvers and the schedule evaluator
+        memory: buckets * n^2 * 4 bytes
+"""
+class SpeedProfile:
+    MINUTES = 24 * 60
+
+    def __init__(self, starts = [], factors = []):
+        self.starts = [0] + list(starts)
+        self.factors = [1.0] + list(factors)
+        self.constant = all(factor == 1.0 for factor in self.factors)
+
+        self.buckets = [0] * SpeedProfile.MINUTES
+        bucket = 0
+        for minute in range(SpeedProfile.MINUTES):
+            while bucket + 1 < len(self.starts) and self.starts[bucket + 1] <= minute * 60:
+                bucket += 1
+            self.buckets[minute] = bucket
+
+        self._tables = Map()
+
+    @staticmethod
+    def load(filename):
+        rows = []
+        try:
+            with open(filename) as csv_file:
+                for row in csv.DictReader(csv_file, delimiter=','):
+                    rows.append((int(dtime(row['start'])), float(row['factor'])))
+        except FileNotFoundError:
+            pass
+
+        rows.sort()
+        return SpeedProfile([start for start, _ in rows], [factor for _, factor in rows])
+
+    def bucket(self, time):
+        return self.buckets[time // 60 % SpeedProfile.MINUTES]
+
+    def factor(self, time):
+        return self.factors[self.buckets[time // 60 % SpeedProfile.MINUTES]]
+
+    def travel_time(self, distance, depart, speed):
+        return round(distance * 3600 / (speed * self.factor(depart)))
+
+    def tables(self, D, speed):
+        cached = self._tables[speed]
+        if cached is not None and cached[0] is D:
+            return cached[1]
+
+        import numpy as np
+        factors = np.asarray(self.factors)
+        tables = np.rint(D[None, :, :] * 3600 / (speed * factors[:, None, None])).astype(np.int32)
+        self._tables[speed] = (D, tables)
+        return tables
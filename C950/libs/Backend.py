@@ -0,0 +1,103 @@
+"""
+Backend: storage backend factory, every collection of the program is created through it
+    STORAGE_BACKEND (constants.py) picks the containers:
+        'custom' - HashMap / HashSet everywhere (default)
+        'builtin' - dict / set (DictMap / DictSet) for unordered maps and sets,
+            HashMap is kept as the ordered index only where order is used
+        'persistent' - like 'custom', but WGUPS state maps are PersistentHashMap (enables WGUPS.snapshot())
+
+    Map(default_value = None) - unordered map, iterates in insertion order with the builtin backend
+    OrderedMap(order_by = 'key', default_value = None) - HashMap with every backend:
+        begin / end, prev / next links, range queries, owner links (Route.stops, Insertion, deadlines index)
+    Set() - set of keys
+    StateMap() - WGUPS addresses, packages, trucks and routes
+
+    every backend has the same node contract:
+        map.insert(key, value) -> node, node.key and node.value are the stored key and value
+        map.remove(key) -> removed node or None
+        set.insert(key) -> node, set.remove(key) -> removed node or None
+        nodes of a PersistentHashMap are immutable, DictNode is a detached record: changing it does not change the map
+
+DictMap: dict with the HashMap interface
+    map[key] -> value, None if key is not found (a deepcopy of default_value is inserted if it is set)
+    insert(key, value) -> DictNode, remove(key) -> DictNode or None, get_value(key), version
+    keys() / values() / items() - dict views
+
+DictSet: set with the HashSet interface
+    insert(key) -> DictNode, remove(key) -> DictNode or None, keys() -> list
+
+DictNode: key and value of an entry of a DictMap / DictSet (value is None for a set)
+"""
+from copy import deepcopy
+from .Hash import HashMap, HashSet
+from .Persistent import PersistentHashMap
+from ..constants import STORAGE_BACKEND
+
+class DictNode:
+    __slots__ = ('key', 'value')
+
+    def __init__(self, key, value = None):
+        self.key = key
+        self.value = value
+
+class DictMap(dict):
+    def __init__(self, capacity = 8, order_by = 'key', default_value = None):
+        dict.__init__(self)
+        self.default_value = default_value
+        self.version = 0
+
+    def __getitem__(self, key):
+        return self.get_value(key)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.version += 1
+
+    def get_value(self, key):
+        value = self.get(key)
+        if value is None and self.default_value is not None and key not in self:
+            value = deepcopy(self.default_value)
+            self[key] = value
+        return value
+
+    def insert(self, key, value = None):
+        self[key] = value
+        return DictNode(key, value)
+
+    def remove(self, key):
+        if key not in self:
+            return None
+        self.version += 1
+        return DictNode(key, self.pop(key))
+
+class DictSet(set):
+    def insert(self, key):
+        self.add(key)
+        return DictNode(key)
+
+    def remove(self, key):
+        if key not in self:
+            return None
+        self.discard(key)
+        return DictNode(key)
+
+    def keys(self):
+        return list(self)
+
+def Map(default_value = None):
+    if STORAGE_BACKEND == 'builtin':
+        return DictMap(default_value= default_value)
+    return HashMap(default_value= default_value)
+
+def OrderedMap(order_by = 'key', default_value = None):
+    return HashMap(order_by= order_by, default_value= default_value)
+
+def Set():
+    if STORAGE_BACKEND == 'builtin':
+        return DictSet()
+    return HashSet()
+
+def StateMap():
+    if STORAGE_BACKEND == 'persistent':
+        return PersistentHashMap()
+    return Map()
@@ -0,0 +1,55 @@
+"""
+DisjointSet: union-find with path compression and union by size
+    parents and sizes are kept in HashMaps, any hashable key can be used
+    keys are added on first use
+
+    find(key) -> root key, O(α(n)) amortized
+    union(key1, key2) -> root key of the merged set
+    connected(key1, key2) -> bool
+    size(key) -> int - number of keys in key's set
+"""
+from .Backend import Map
+
+class DisjointSet:
+    def __init__(self):
+        self.parents = Map()
+        self.sizes = Map()
+
+    def __contains__(self, key):
+        return key in self.parents
+
+    def find(self, key):
+        parent = self.parents[key]
+        if parent is None:
+            self.parents[key] = key
+            self.sizes[key] = 1
+            return key
+
+        root = key
+        while parent != root:
+            root = parent
+            parent = self.parents[root]
+
+        while key != root:
+            parent = self.parents[key]
+            self.parents[key] = root
+            key = parent
+        return root
+
+    def union(self, key1, key2):
+        root1 = self.find(key1)
+        root2 = self.find(key2)
+        if root1 == root2:
+            return root1
+
+        if self.sizes[root1] < self.sizes[root2]:
+            root1, root2 = root2, root1
+        self.parents[root2] = root1
+        self.sizes[root1] += self.sizes[root2]
+        return root1
+
+    def connected(self, key1, key2):
+        return self.find(key1) == self.find(key2)
+
+    def size(self, key):
+        return self.sizes[self.find(key)]
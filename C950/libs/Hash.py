@@ -1,13 +1,23 @@
 """
 HashSet:
     self-addjusting capacity (rehashing)
+        grows (x2) when size / capacity reaches load_factor (default: LOAD_FACTOR),
+        shrinks (/2) when it falls below load_factor / 4 after removals, never below the initial capacity
     store HashNode objects in buckets
         To prevent collisions, HashNode objects can be linked together in buckets to form a linked list.
+        capacity is a prime (the next prime >= the requested / doubled / halved capacity),
+            so hash % capacity depends on every bit of the hash, not only its low bits:
+            keys whose hashes only differ in their high bits (eg: Insertion's float midpoint keys)
+            do not all land in one bucket
 
     insert O(1) average, O(n) worst case
     remove O(1) average, O(n) worst case
     lookup O(1) average, O(n) worst case
 
+    rehashes: int - number of times the table grew or shrank
+    stats() -> HashStats - chain lengths, load, rehashes, memory estimate (and tree height for a HashMap), O(n)
+        eg: print(wgups.packages.stats())
+
 HashMap:
     built on top of HashSet, inherits lookup O(1) average
     store HashNode objects in a BST (beside the HashSet buckets)
@@ -19,9 +29,25 @@ HashMap:
     lookup O(1)
     peek (min/max) O(1)
     sorted O(n)
+
+    version: int - incremented on every insert / remove / value replacement,
+        lets callers cache results computed from the map and cheaply detect changes
+
+    keys() / values() / items() -> HashMapView - lazy views, nothing is copied
+        iterate in order (reversed() from the end), len() O(1), `in` O(1) for keys
+        they follow later changes of the map, use list(...) for a snapshot
+    floor / ceiling / range - see BST, eg: packages.range(10, 20) -> nodes of packages 10 .. 19
+    batch() - see BST, defers reordering a value ordered map until many values / watched objects are updated
 """
 from .Tree import TreeNode, BST
 from copy import deepcopy
+from sys import getsizeof
+
+def next_prime(n):
+    n = max(n, 2)
+    while any(n % d == 0 for d in range(2, int(n ** 0.5) + 1)):
+        n += 1
+    return n
 
 class HashNode(TreeNode):
     def __init__(self, key, value = None):
@@ -33,13 +59,39 @@ class HashNode(TreeNode):
     def __hash__(self) -> int:
         return hash(self.key)
     
+class HashStats:
+    def __init__(self, size, capacity, rehashes, chains, memory, height = None):
+        used = [n for n in chains if n > 0]
+        self.size = size
+        self.capacity = capacity
+        self.load = size / capacity
+        self.rehashes = rehashes
+        self.empty = capacity - len(used)
+        self.max_chain = max(used, default=0)
+        self.mean_chain = sum(used) / len(used) if len(used) > 0 else 0.0
+        self.memory = memory
+        self.height = height
+
+    def __str__(self):
+        s = f'size: {self.size} - capacity: {self.capacity} - load: {self.load:.2f} - rehashes: {self.rehashes}'
+        s += f' - chains: max {self.max_chain}, mean {self.mean_chain:.2f} - empty buckets: {self.empty}'
+        s += f' - memory: ~{self.memory / 1024:.1f} KB'
+        if self.height is not None:
+            s += f' - tree height: {self.height}'
+        return s
+
 class HashSet():
     LOAD_FACTOR = 0.75
 
-    def __init__(self, capacity=8):
-        self.capacity = capacity
+    def __init__(self, capacity=8, load_factor = LOAD_FACTOR):
+        if load_factor <= 0:
+            raise ValueError('load_factor must be greater than 0')
+        self.capacity = next_prime(capacity)
+        self.min_capacity = self.capacity
+        self.load_factor = load_factor
         self.size = 0
-        self.buckets = [None] * capacity
+        self.rehashes = 0
+        self.buckets = [None] * self.capacity
 
     def __len__(self):
         return self.size
@@ -68,8 +120,7 @@ class HashSet():
             node = node.link
         return None
 
-    def _rehash(self):
-        new_capacity = self.capacity * 2
+    def _rehash(self, new_capacity):
         new_buckets = [None] * new_capacity
         for node in self.buckets:
             while node is not None:
@@ -82,10 +133,25 @@ class HashSet():
                 node = link
         self.buckets = new_buckets
         self.capacity = new_capacity
+        self.rehashes += 1
 
     def _rehash_check(self):
-        if self.size / self.capacity >= self.LOAD_FACTOR:
-            self._rehash()
+        if self.size / self.capacity >= self.load_factor:
+            self._rehash(next_prime(self.capacity * 2))
+        elif self.capacity > self.min_capacity and self.size / self.capacity < self.load_factor / 4:
+            self._rehash(max(next_prime(self.capacity // 2), self.min_capacity))
+
+    def stats(self):
+        chains = []
+        memory = getsizeof(self.buckets)
+        for node in self.buckets:
+            n = 0
+            while node is not None:
+                n += 1
+                memory += getsizeof(node) + getsizeof(node.__dict__)
+                node = node.link
+            chains.append(n)
+        return HashStats(self.size, self.capacity, self.rehashes, chains, memory)
 
     def insert(self, key):
         idx = hash(key) % self.capacity
@@ -115,6 +181,7 @@ class HashSet():
                     prev.link = node.link
 
                 self.size -= 1
+                self._rehash_check()
                 return node
             prev = node
             node = node.link
@@ -122,10 +189,11 @@ class HashSet():
         return None
     
 class HashMap(BST, HashSet):
-    def __init__(self, capacity=8, order_by = 'key', default_value = None):
-        HashSet.__init__(self, capacity)
+    def __init__(self, capacity=8, order_by = 'key', default_value = None, load_factor = HashSet.LOAD_FACTOR):
+        HashSet.__init__(self, capacity, load_factor)
         BST.__init__(self, order_by)
         self.default_value = default_value
+        self.version = 0
 
     def __getitem__(self, key):
         return self.get_value(key)
@@ -134,6 +202,7 @@ class HashMap(BST, HashSet):
         node = HashSet._get_node(self, key)
         if node is not None:
             node.value = value
+            self.version += 1
         else:
             self.insert(key, value)
 
@@ -157,27 +226,25 @@ class HashMap(BST, HashSet):
     def end(self):
         return self.end_inorder
     
+    def __reversed__(self):
+        node = self.end_inorder
+        while node is not None:
+            yield node
+            node = node.prev
+
     def keys(self):
-        keys = []
-        for node in self:
-            keys.append(node.key)
-        return keys
+        return KeysView(self, lambda node: node.key)
 
     def values(self):
-        values = []
-        for node in self:
-            values.append(node.value)
-        return values
+        return HashMapView(self, lambda node: node.value)
     
     def items(self):
-        items = []
-        for node in self:
-            items.append((node.key, node.value))
-        return items
+        return HashMapView(self, lambda node: (node.key, node.value))
     
     def insert(self, key, value = None):
         size_before_insert = self.size
         node = HashSet.insert(self, key)
+        self.version += 1
 
         node.value = value
         if hasattr(node.value, 'owner'):
@@ -191,12 +258,48 @@ class HashMap(BST, HashSet):
     def remove(self, key):
         node = HashSet.remove(self, key)
         if node is not None:
+            self.version += 1
             if hasattr(node.value, 'owner'):
                 node.value.owner = None
             BST.remove_node(self, node)
 
         return node
+
+    def stats(self):
+        stats = HashSet.stats(self)
+        stats.height = TreeNode.get_height(self.root) + 1
+        return stats
     
+class HashMapView:
+    def __init__(self, map, get):
+        self.map = map
+        self.get = get
+
+    def __len__(self):
+        return len(self.map)
+
+    def __iter__(self):
+        for node in self.map:
+            yield self.get(node)
+
+    def __reversed__(self):
+        for node in reversed(self.map):
+            yield self.get(node)
+
+    def __contains__(self, item):
+        # O(n) scan, KeysView overrides it with a hash lookup
+        for node in self.map:
+            if self.get(node) == item:
+                return True
+        return False
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)})'
+
+class KeysView(HashMapView):
+    def __contains__(self, key):
+        return key in self.map
+
 def watch(*attrs):
     def _watch(cls):
         class Watch(cls):
@@ -0,0 +1,118 @@
+"""
+Heap: indexed binary min-heap, array-backed
+    items are ordered by priority (any comparable value), ties are popped in push order
+    push returns a handle (HeapNode) that tracks the item's position in the array,
+        so its priority can be changed or it can be removed without searching
+
+    push(item, priority) -> HeapNode - O(log n)
+    pop() -> (item, priority) - item with the smallest priority, O(log n)
+    peek() -> (item, priority) - O(1)
+    update(handle, priority) - decrease or increase the priority, O(log n)
+    remove(handle) -> (item, priority) - O(log n)
+    handle in heap -> bool - O(1), False once the item is popped or removed
+
+    eg: max-heap with negated priorities: heap.push(item, -priority)
+"""
+
+class HeapNode:
+    __slots__ = ('item', 'priority', 'order', 'index')
+
+    def __init__(self, item, priority, order, index):
+        self.item = item
+        self.priority = priority
+        self.order = order
+        self.index = index
+
+class Heap:
+    def __init__(self):
+        self.nodes = []
+        self.pushed = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __bool__(self):
+        return len(self.nodes) > 0
+
+    def __contains__(self, handle):
+        return 0 <= handle.index < len(self.nodes) and self.nodes[handle.index] is handle
+
+    def push(self, item, priority):
+        handle = HeapNode(item, priority, self.pushed, len(self.nodes))
+        self.pushed += 1
+        self.nodes.append(handle)
+        self._sift_up(handle.index)
+        return handle
+
+    def peek(self):
+        if len(self.nodes) == 0:
+            raise IndexError('peek from an empty heap')
+        handle = self.nodes[0]
+        return handle.item, handle.priority
+
+    def pop(self):
+        if len(self.nodes) == 0:
+            raise IndexError('pop from an empty heap')
+        return self.remove(self.nodes[0])
+
+    def update(self, handle, priority):
+        if handle not in self:
+            raise KeyError('handle is not in the heap')
+        decreased = priority < handle.priority
+        handle.priority = priority
+        if decreased:
+            self._sift_up(handle.index)
+        else:
+            self._sift_down(handle.index)
+
+    def remove(self, handle):
+        if handle not in self:
+            raise KeyError('handle is not in the heap')
+        i = handle.index
+        last = self.nodes.pop()
+        if last is not handle:
+            self.nodes[i] = last
+            last.index = i
+            self._sift_up(i)
+            self._sift_down(last.index)
+
+        handle.index = -1
+        return handle.item, handle.priority
+
+    def _lt(self, node1, node2):
+        if node1.priority < node2.priority:
+            return True
+        if node2.priority < node1.priority:
+            return False
+        return node1.order < node2.order
+
+    def _sift_up(self, i):
+        nodes = self.nodes
+        node = nodes[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not self._lt(node, nodes[parent]):
+                break
+            nodes[i] = nodes[parent]
+            nodes[i].index = i
+            i = parent
+        nodes[i] = node
+        node.index = i
+
+    def _sift_down(self, i):
+        nodes = self.nodes
+        n = len(nodes)
+        node = nodes[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and self._lt(nodes[child + 1], nodes[child]):
+                child += 1
+            if not self._lt(nodes[child], node):
+                break
+            nodes[i] = nodes[child]
+            nodes[i].index = i
+            i = child
+        nodes[i] = node
+        node.index = i
@@ -0,0 +1,40 @@
+"""
+MetricClosure: shortest path distances between every pair of nodes of a distance matrix (numpy required)
+    the closed distances satisfy the triangle inequality: D[i][j] <= D[i][k] + D[k][j]
+    D: numpy.ndarray - closed distances, rounded to decimals
+    next_hop: numpy.ndarray[int] - next node after i on the shortest path from i to j
+    violations: list[(int, int)] - pairs (i, j) whose direct distance is longer than a path through other nodes
+
+    path(i, j) -> list[int] - nodes on the shortest path from i to j, both included, O(path length)
+
+    algorithm: Floyd-Warshall, for every intermediate node k, all pairs are relaxed at once:
+        D = min(D, D[:, k] + D[k, :]), next_hop[i][j] = next_hop[i][k] where the path through k is shorter
+    O(n^3) time, O(n^2) memory, n numpy operations on n x n arrays
+"""
+import numpy as np
+
+class MetricClosure:
+    def __init__(self, D, decimals = 1):
+        D = np.array(D, dtype=np.float64)
+        n = len(D)
+        next_hop = np.tile(np.arange(n), (n, 1))
+        # distances are given with a fixed number of decimals, float sums of them are not exact
+        epsilon = 0.5 * 10 ** -decimals
+
+        for k in range(n):
+            via = D[:, k, None] + D[None, k, :]
+            shorter = via < D - epsilon
+            D = np.where(shorter, via, D)
+            next_hop = np.where(shorter, next_hop[:, k, None], next_hop)
+
+        self.D = np.round(D, decimals)
+        self.next_hop = next_hop
+        rows, columns = np.nonzero(next_hop != np.arange(n)[None, :])
+        self.violations = list(zip(rows.tolist(), columns.tolist()))
+
+    def path(self, i, j):
+        path = [i]
+        while i != j:
+            i = int(self.next_hop[i][j])
+            path.append(i)
+        return path
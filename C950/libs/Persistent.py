@@ -0,0 +1,243 @@
+"""
+PersistentHashMap: copy-on-write (path-copying) variant of HashMap for cheap what-if branching
+    an immutable AVL tree ordered by key, updates never change a node that a snapshot can see:
+        they copy the O(log n) nodes on the path from the root to the changed key and share every other node
+    snapshot() -> PersistentHashMap - O(1), shares the whole tree, later updates of either map are not seen by the other
+        hundreds of branches of one map only cost the paths they changed
+
+    insert / __setitem__ O(log n), copies O(log n) nodes
+    remove O(log n), copies O(log n) nodes
+    lookup O(log n) - no hash buckets, they cannot be shared between snapshots (keys must be comparable)
+    peek (begin / end) O(log n)
+    keys() / values() / items() - lazy views in key order, like HashMap
+    floor / ceiling / range / select - like BST, O(log n + k)
+    version: int - incremented on every change, like HashMap
+
+    values are shared between snapshots, not copied:
+        replace a value (wgups.packages[id] = changed_copy) instead of mutating it in place to keep branches apart
+        packages and routes are copied with copy.copy() (see Package.__copy__(), Route.__copy__())
+"""
+from copy import deepcopy
+from .Hash import HashMapView, KeysView
+
+class PersistentNode:
+    __slots__ = ('key', 'value', 'left', 'right', 'height', 'size')
+
+    def __init__(self, key, value, left = None, right = None):
+        self.key = key
+        self.value = value
+        self.left = left
+        self.right = right
+        self.height = max(height(left), height(right)) + 1
+        self.size = size(left) + size(right) + 1
+
+def height(node):
+    return -1 if node is None else node.height
+
+def size(node):
+    return 0 if node is None else node.size
+
+def balance(key, value, left, right):
+    if height(left) - height(right) == 2:
+        if height(left.left) < height(left.right):
+            left = rotate_left(left)
+        return rotate_right(PersistentNode(key, value, left, right))
+    if height(right) - height(left) == 2:
+        if height(right.right) < height(right.left):
+            right = rotate_right(right)
+        return rotate_left(PersistentNode(key, value, left, right))
+    return PersistentNode(key, value, left, right)
+
+def rotate_left(node):
+    right = node.right
+    return PersistentNode(right.key, right.value, PersistentNode(node.key, node.value, node.left, right.left), right.right)
+
+def rotate_right(node):
+    left = node.left
+    return PersistentNode(left.key, left.value, left.left, PersistentNode(node.key, node.value, left.right, node.right))
+
+def insert(node, key, value):
+    # -> new subtree root, True if the key is new
+    if node is None:
+        return PersistentNode(key, value), True
+    if key < node.key:
+        left, added = insert(node.left, key, value)
+        return balance(node.key, node.value, left, node.right), added
+    if node.key < key:
+        right, added = insert(node.right, key, value)
+        return balance(node.key, node.value, node.left, right), added
+    return PersistentNode(key, value, node.left, node.right), False
+
+def remove(node, key):
+    # -> new subtree root, removed node (None if the key is not found)
+    if node is None:
+        return None, None
+    if key < node.key:
+        left, removed = remove(node.left, key)
+        if removed is None:
+            return node, None
+        return balance(node.key, node.value, left, node.right), removed
+    if node.key < key:
+        right, removed = remove(node.right, key)
+        if removed is None:
+            return node, None
+        return balance(node.key, node.value, node.left, right), removed
+
+    if node.left is None:
+        return node.right, node
+    if node.right is None:
+        return node.left, node
+    successor = node.right
+    while successor.left is not None:
+        successor = successor.left
+    right, _ = remove(node.right, successor.key)
+    return balance(successor.key, successor.value, node.left, right), node
+
+class PersistentHashMap:
+    def __init__(self, default_value = None, root = None):
+        self.root = root
+        self.default_value = default_value
+        self.version = 0
+
+    def snapshot(self):
+        snapshot = PersistentHashMap(self.default_value, self.root)
+        snapshot.version = self.version
+        return snapshot
+
+    def __len__(self):
+        return size(self.root)
+
+    def __contains__(self, key):
+        return self._get_node(key) is not None
+
+    def __getitem__(self, key):
+        return self.get_value(key)
+
+    def __setitem__(self, key, value):
+        self.insert(key, value)
+
+    def _get_node(self, key):
+        node = self.root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return node
+        return None
+
+    def get_value(self, key):
+        node = self._get_node(key)
+        if node is None and self.default_value is not None:
+            node = self.insert(key, deepcopy(self.default_value))
+        return node.value if node is not None else None
+
+    def insert(self, key, value = None):
+        self.root, _ = insert(self.root, key, value)
+        self.version += 1
+        return self._get_node(key)
+
+    def remove(self, key):
+        self.root, node = remove(self.root, key)
+        if node is not None:
+            self.version += 1
+        return node
+
+    def __iter__(self):
+        stack = []
+        node = self.root
+        while len(stack) > 0 or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def __reversed__(self):
+        stack = []
+        node = self.root
+        while len(stack) > 0 or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node
+            node = node.left
+
+    @property
+    def begin(self):
+        return next(iter(self), None)
+
+    @property
+    def end(self):
+        return next(reversed(self), None)
+
+    def keys(self):
+        return KeysView(self, lambda node: node.key)
+
+    def values(self):
+        return HashMapView(self, lambda node: node.value)
+
+    def items(self):
+        return HashMapView(self, lambda node: (node.key, node.value))
+
+    def floor(self, key):
+        floor = None
+        node = self.root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            else:
+                floor = node
+                node = node.right
+        return floor
+
+    def ceiling(self, key):
+        ceiling = None
+        node = self.root
+        while node is not None:
+            if node.key < key:
+                node = node.right
+            else:
+                ceiling = node
+                node = node.left
+        return ceiling
+
+    def range(self, lo = None, hi = None):
+        # in order walk that skips subtrees below lo and stops at hi
+        stack = []
+        node = self.root
+        while len(stack) > 0 or node is not None:
+            while node is not None:
+                if lo is not None and node.key < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if len(stack) == 0:
+                return
+            node = stack.pop()
+            if hi is not None and not node.key < hi:
+                return
+            yield node
+            node = node.right
+
+    def select(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if i < 0 or i >= n:
+            raise IndexError('PersistentHashMap index out of range')
+
+        node = self.root
+        while True:
+            left = size(node.left)
+            if i < left:
+                node = node.left
+            elif i == left:
+                return node
+            else:
+                i -= left + 1
+                node = node.right
@@ -0,0 +1,144 @@
+"""
+Shared: read-only arrays published once in shared memory (multiprocessing.shared_memory)
+    worker processes attach to a block by name, nothing is copied or pickled but a small handle per task
+    blocks of this process (published, or inherited through fork) are reused, attaching costs nothing
+    other blocks are opened once per process and cached, later tasks of a worker attach for free,
+    they are closed at exit (their views released first), the owner unlinks them
+    a block is only closed once nothing exports it: while a numpy array from array() is alive the close is skipped,
+        the array keeps the block open and SharedMemory closes it when it is garbage collected
+
+SharedArray: owner of a shared memory block holding a copy of an array
+    SharedArray(data) - data: numpy.ndarray (C-contiguous) or array.array, copied once, O(n)
+    handle: tuple - (name, format, shape), picklable, send it to workers instead of the data
+    close() - unlink the block, also on `with` exit, garbage collection and interpreter exit
+        the views attach() / rows() handed out over the block in this process are released (using them raises ValueError),
+        a block still used by a numpy array from array() is unmapped when the array is gone
+        workers that are still attached keep their mapping until they exit
+
+attach(handle) -> memoryview - read-only flat view of a published array, items in the array's format
+rows(handle) -> list[memoryview] - rows of a 2D array as zero-copy slices, rows[i][j] reads like a list of lists
+    both are made once per block and process, later calls return the same view / list (do not modify the list)
+    for pure python inner loops (eg: IteratedLocalSearch.tour_cost), about as fast as indexing lists
+array(handle) -> numpy.ndarray - zero-copy read-only numpy view (numpy required)
+    it reads the block through __array_interface__, not a buffer export, and holds the block open while it is alive
+"""
+import atexit
+import weakref
+from math import prod
+from struct import calcsize
+from multiprocessing import shared_memory
+from .Backend import Map
+
+_blocks = Map()
+_views = Map()
+_flat = Map()
+_rows = Map()
+_arrays = Map()
+
+def _track(name, view):
+    views = _views[name]
+    if views is None:
+        views = []
+        _views[name] = views
+    views.append(view)
+    return view
+
+class _Export:
+    # keeps the block open for the numpy arrays made from it (see array())
+    __slots__ = ('shm', '__array_interface__', '__weakref__')
+
+    def __init__(self, shm, interface):
+        self.shm = shm
+        self.__array_interface__ = interface
+
+def _close(shm):
+    views = _views[shm.name] or []
+    arrays = _arrays[shm.name]
+    for data in (_views, _flat, _rows, _arrays):
+        data.remove(shm.name)
+    exported = arrays is not None and len(arrays) > 0
+    for view in reversed(views):
+        try:
+            view.release()
+        except BufferError:
+            # exported by a view made outside of this module
+            exported = True
+    if not exported:
+        shm.close()
+
+def _release(shm):
+    _close(shm)
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+def _open(name):
+    try:
+        # Python 3.13+
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # workers share the owner's resource tracker, the block is registered once and unlinked by the owner
+        shm = shared_memory.SharedMemory(name=name)
+    atexit.register(_close, shm)
+    return shm
+
+class SharedArray:
+    def __init__(self, data):
+        view = memoryview(data)
+        if not view.c_contiguous:
+            raise ValueError('shared arrays must be C-contiguous')
+        shm = shared_memory.SharedMemory(create=True, size=max(view.nbytes, 1))
+        self._finalizer = weakref.finalize(self, _release, shm)
+        self.handle = (shm.name, view.format, view.shape)
+        shm.buf[:view.nbytes] = view.cast('B')
+        view.release()
+        _blocks[shm.name] = shm
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        _blocks.remove(self.handle[0])
+        self._finalizer()
+
+def attach(handle):
+    name, format, shape = handle
+    flat = _flat[name]
+    if flat is None:
+        shm = _blocks[name]
+        if shm is None:
+            shm = _open(name)
+            _blocks[name] = shm
+        view = _track(name, shm.buf[:prod(shape) * calcsize(format)])
+        view = _track(name, view.cast(format))
+        flat = _track(name, view.toreadonly())
+        _flat[name] = flat
+    return flat
+
+def rows(handle):
+    name, _, shape = handle
+    data = _rows[name]
+    if data is None:
+        view = attach(handle)
+        n, m = shape
+        data = [_track(name, view[i * m:(i + 1) * m]) for i in range(n)]
+        _rows[name] = data
+    return data
+
+def array(handle):
+    import numpy as np
+    name, format, shape = handle
+    view = np.frombuffer(attach(handle), dtype=format)
+    interface = dict(view.__array_interface__, shape=tuple(shape))
+    del view
+    arrays = _arrays[name]
+    if arrays is None:
+        arrays = weakref.WeakSet()
+        _arrays[name] = arrays
+    export = _Export(_blocks[name], interface)
+    arrays.add(export)
+    return np.asarray(export)
@@ -2,7 +2,26 @@
 BST:
     implemented as a self-balancing AVL tree
     added custom self-adjustment to keep track of inorder traversal (sort, heap peek)
+
+    range queries on the order_by attribute, O(log n) descent from the root + O(k) along the inorder links:
+        floor(value) -> TreeNode - node with the largest order_by <= value, None if there is none
+        ceiling(value) -> TreeNode - node with the smallest order_by >= value, None if there is none
+        range(lo, hi) -> iterator[TreeNode] - nodes with lo <= order_by < hi in order, None for no bound
+
+    order statistics: every node keeps its subtree size, updated with its height (rotations, inserts, removals)
+        select(i) -> TreeNode - i-th node in order (0 based, negative from the end), O(log n)
+        rank(node) -> int - position of node in order (0 based), O(log n)
+
+    batch() - context manager that defers self-adjustment of changed nodes (order_by writes, watched attributes)
+        on exit, only the changed nodes are repositioned: all removed then reinserted, O(k log n) for k nodes,
+        or the whole tree is rebuilt in O(n) (+ sort of a nearly sorted list) when more than REBUILD_RATIO changed
+        the order (iteration, begin / end, range queries) is stale inside the block, batches can be nested
+        inserting a node inside the block first repositions the nodes changed so far (its descent needs an ordered tree),
+        then places the new node right away, removing a node is done right away
+        eg: with map.batch():
+                for node in map: node.value = priority(node)
 """
+from contextlib import contextmanager
 
 class TreeNode:
     def __init__(self, value):
@@ -17,6 +36,8 @@ class TreeNode:
         self.predecessor = None
         self.successor = None
         self.height = 0
+        self.size = 1
+        self.dirty = False
 
     @property
     def next(self):
@@ -97,8 +118,15 @@ class TreeNode:
     def get_balance(self):
         return TreeNode.get_height(self.left) - TreeNode.get_height(self.right)
     
+    @staticmethod
+    def get_size(node):
+        if node is None:
+            return 0
+        return node.size
+
     def update_height(self):
         self.height = max(TreeNode.get_height(self.left), TreeNode.get_height(self.right)) + 1
+        self.size = TreeNode.get_size(self.left) + TreeNode.get_size(self.right) + 1
     
     def set_left(self, left):
         self.left = left
@@ -121,14 +149,126 @@ class TreeNode:
         return False
 
 class BST():
+    REBUILD_RATIO = 0.5
+
     def __init__(self, order_by = 'value'):
         self.root = None
         self.begin_inorder = None
         self.end_inorder = None
         self.order_by = order_by
+        self.batch_depth = 0
+        self.dirty_nodes = []
+
+    @contextmanager
+    def batch(self):
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.flush()
+
+    def flush(self):
+        dirty_nodes = [node for node in self.dirty_nodes if node.tree is self]
+        self.dirty_nodes = []
+        for node in dirty_nodes:
+            node.dirty = False
+        if len(dirty_nodes) == 0:
+            return
+
+        if len(dirty_nodes) > self.REBUILD_RATIO * TreeNode.get_size(self.root):
+            self.rebuild()
+            return
+
+        # the unchanged nodes are still in order, so removing every changed node leaves a valid tree
+        for node in dirty_nodes:
+            self.remove_node(node)
+        for node in dirty_nodes:
+            self.insert_node(node)
+
+    def rebuild(self):
+        nodes = []
+        node = self.begin_inorder
+        while node is not None:
+            nodes.append(node)
+            node = node.successor
+        nodes.sort(key=lambda node: node.__getattribute__(self.order_by))
+
+        self.root = self._build(nodes, 0, len(nodes), None)
+        for i, node in enumerate(nodes):
+            node.predecessor = nodes[i - 1] if i > 0 else None
+            node.successor = nodes[i + 1] if i + 1 < len(nodes) else None
+        self.begin_inorder = nodes[0] if len(nodes) > 0 else None
+        self.end_inorder = nodes[-1] if len(nodes) > 0 else None
+
+    def _build(self, nodes, lo, hi, parent):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        node.parent = parent
+        node.left = self._build(nodes, lo, mid, node)
+        node.right = self._build(nodes, mid + 1, hi, node)
+        node.update_height()
+        return node
 
     def _lt(self, node1, node2):
         return node1.__getattribute__(self.order_by) < node2.__getattribute__(self.order_by)
+
+    def floor(self, value):
+        floor = None
+        node = self.root
+        while node is not None:
+            if value < node.__getattribute__(self.order_by):
+                node = node.left
+            else:
+                floor = node
+                node = node.right
+        return floor
+
+    def ceiling(self, value):
+        ceiling = None
+        node = self.root
+        while node is not None:
+            if node.__getattribute__(self.order_by) < value:
+                node = node.right
+            else:
+                ceiling = node
+                node = node.left
+        return ceiling
+
+    def select(self, i):
+        size = TreeNode.get_size(self.root)
+        if i < 0:
+            i += size
+        if i < 0 or i >= size:
+            raise IndexError('BST index out of range')
+
+        node = self.root
+        while True:
+            left = TreeNode.get_size(node.left)
+            if i < left:
+                node = node.left
+            elif i == left:
+                return node
+            else:
+                i -= left + 1
+                node = node.right
+
+    def rank(self, node):
+        rank = TreeNode.get_size(node.left)
+        while node.parent is not None:
+            if node.parent.right is node:
+                rank += TreeNode.get_size(node.parent.left) + 1
+            node = node.parent
+        return rank
+
+    def range(self, lo = None, hi = None):
+        node = self.begin_inorder if lo is None else self.ceiling(lo)
+        while node is not None and (hi is None or node.__getattribute__(self.order_by) < hi):
+            yield node
+            node = node.successor
         
     def rotate_left(self, node):
         right_left_child = node.right.left
@@ -141,6 +281,7 @@ class BST():
 
         node.right.set_left(node)
         node.set_right(right_left_child)
+        node.parent.update_height()
         
         return node.parent
 
@@ -155,10 +296,17 @@ class BST():
 
         node.left.set_right(node)
         node.set_left(left_right_child)
+        node.parent.update_height()
         
         return node.parent
     
     def self_adjust(self, node):
+        if self.batch_depth > 0:
+            if not node.dirty:
+                node.dirty = True
+                self.dirty_nodes.append(node)
+            return
+
         predecessor = node.predecessor
         successor = node.successor
 
@@ -191,6 +339,9 @@ class BST():
     def insert_node(self, node):
         if node is None:
             return
+
+        if self.batch_depth > 0 and len(self.dirty_nodes) > 0:
+            self.flush()
         
         node.initialize()
         node.tree = self
@@ -236,8 +387,11 @@ class BST():
         node.unlink_inorder()
 
         if node.left is not None and node.right is not None:
+            # rebalance from the lowest changed node: the successor's old parent, or the successor itself
+            changed = successor_node
             successor_node.set_left(node.left)
             if successor_node.parent is not node:
+                changed = successor_node.parent
                 successor_node.parent.replace_child(successor_node, successor_node.right)
                 successor_node.set_right(node.right)
                 
@@ -247,7 +401,7 @@ class BST():
             else:
                 parent.replace_child(node, successor_node)
 
-            self.self_balance(successor_node)
+            parent = changed
 
         elif node is self.root:
             if node.left is not None:
@@ -273,4 +427,4 @@ class BST():
 
     def remove_node2(self, node):
         if node is None:
-            return
\ No newline at end of file
+            return
\ No newline at end of file
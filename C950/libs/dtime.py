@@ -1,15 +1,29 @@
-from datetime import datetime, timedelta
-
-# dtime is a timedelta object with a formated string / int constructor
-# and a int() method to return the time in a 4 digit integer format
-# e.g. dtime('1234') or dt(1234) -> 12:34:00
-class dtime(timedelta):
-    def __new__(cls, input: str | int = None, **kargs):
+# dtime is an int number of seconds since midnight with a formated string / int constructor,
+# a timedelta-like str() (H:MM:SS) and a hhmm() method to return the time in a 4 digit integer format
+# e.g. dtime('1234') or dtime(1234) -> 12:34:00, dtime(hours=1, minutes=30) -> 1:30:00, dtime('1234').hhmm() -> 1234
+# int(t) == t: int() is the number of seconds, like any other int
+#
+# dtime only parses and prints times: every time stored on the model (packages, stops, routes, constraints,
+# wgups.time) is a plain int number of seconds, so hot paths (schedules, status sweeps) never allocate time objects.
+# wrap a time in dtime(seconds= t) where it is printed.
+class dtime(int):
+    def __new__(cls, input: str | int = None, hours = 0, minutes = 0, seconds = 0):
         if input is None:
-            return super().__new__(cls, **kargs)
-        
-        dt = datetime.strptime(str(input), '%H%M')
-        return super().__new__(cls, hours=dt.hour, minutes=dt.minute)
-    
-    def __int__(self):
-        return 100 * int(self.seconds / 3600) + int(self.seconds % 3600 / 60)
\ No newline at end of file
+            return super().__new__(cls, round(hours * 3600 + minutes * 60 + seconds))
+
+        input = str(input)
+        if not input.isdigit() or not 3 <= len(input) <= 4:
+            raise ValueError(f'invalid time format: {input}')
+        hour, minute = divmod(int(input), 100)
+        if hour > 23 or minute > 59:
+            raise ValueError(f'invalid time: {input}')
+        return super().__new__(cls, hour * 3600 + minute * 60)
+
+    def hhmm(self):
+        hour, minute = divmod(self // 60, 60)
+        return 100 * hour + minute
+
+    def __str__(self):
+        minute, second = divmod(self, 60)
+        hour, minute = divmod(minute, 60)
+        return f'{hour}:{minute:02d}:{second:02d}'
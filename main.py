@@ -2,7 +2,7 @@
 # VD - 011882467
 # C950 - Data Structures and Algorithms II - Performance Assessment
 
-from C950.libs.Hash import HashMap
+from C950.libs.Backend import Map
 from C950.WGUPS import WGUPS
 from C950.libs.dtime import dtime
 from C950.constants import START_TIME, END_TIME
@@ -17,6 +17,9 @@ main_menu
         view_packages_status_all
         view_packages_status_one
         view_packages_status_truck
+        view_trucks_position
+        view_packages_status_due
+        view_packages_status_zip_code
         view_packages_status_change_time
     draw_routes
 """
@@ -42,7 +45,7 @@ def main_menu():
         print('Main menu:')
         print('1. View routes')
         print('2. View packages status at a specific time')
-        print('9. Draw routes (matplotlib, numpy, networkx required)')
+        print('9. Draw routes (matplotlib, numpy required)')
         print('0. Exit')
         enter = input('Enter your choice: ')
         if enter == '1':
@@ -56,7 +59,7 @@ def main_menu():
 def view_routes():
     print('-------------------')
     print('Routes:')
-    routes_map = HashMap()
+    routes_map = Map()
     total = {'distance': 0, 'packages': 0, 'late': 0}
     for route in wgups.routes.values():
         d = route.distance
@@ -66,7 +69,7 @@ def view_routes():
         total['packages'] += p
         total['late'] += l
 
-        print(f'\t{route.id}: {route.truck.id}, {route.start_time} - {route.end_time}, {d} miles, {p} packages ({l} late)')       
+        print(f'\t{route.id}: {route.truck.id}, {dtime(seconds= route.start_time)} - {dtime(seconds= route.end_time)}, {d} miles, {p} packages ({l} late)')       
         routes_map[str(len(routes_map) + 1)] = route
     print(f'Total: {total["distance"]} miles, {total["packages"]} packages ({total["late"]} late)')
     
@@ -93,10 +96,13 @@ def view_packages_status_menu():
     while enter != '0':
         print('-------------------')
         print('Packages Status Menu')
-        print(f'Time: {wgups.time}')
+        print(f'Time: {dtime(seconds= wgups.time)}')
         print('1. View all packages status')
         print('2. View a specific package status')
         print('3. View packages status loaded onto a truck')
+        print('4. View trucks position')
+        print('5. View packages status due by a time')
+        print('6. View packages status by zip code')
         print('9. Change time')
         print('0. Back')
         enter = input('Enter your choice: ')
@@ -106,6 +112,12 @@ def view_packages_status_menu():
             view_packages_status_one()
         elif enter == '3':
             view_packages_status_truck()
+        elif enter == '4':
+            view_trucks_position()
+        elif enter == '5':
+            view_packages_status_due()
+        elif enter == '6':
+            view_packages_status_zip_code()
         elif enter == '9':
             view_packages_status_change_time()
 
@@ -113,18 +125,18 @@ def view_packages_status_change_time():
     print('-------------------')
     print('Change time')
     try:
-        input_time = input(f'Enter 4 digits time HHMM ({int(START_TIME)} - {int(END_TIME)}): ')
+        input_time = input(f'Enter 4 digits time HHMM ({START_TIME.hhmm()} - {END_TIME.hhmm()}): ')
         time = dtime(input_time)
         if time < START_TIME or time > END_TIME:
             raise Exception()
-        wgups.time = time
+        wgups.time = int(time)
     except:
         print('[Warning] Invalid time format')
 
 def view_packages_status_all():
     print('-------------------')
     print('View status of all packages')
-    print(f'Time: {wgups.time}')
+    print(f'Time: {dtime(seconds= wgups.time)}')
     for package in wgups.packages.values():
         print(package.info)
 
@@ -133,7 +145,7 @@ def view_packages_status_all():
 def view_packages_status_one():
     print('-------------------')
     print('View status of a specific package')
-    print(f'Time: {wgups.time}')
+    print(f'Time: {dtime(seconds= wgups.time)}')
     try:
         input_id = input('Enter package id: ')
         package = wgups.packages[int(input_id)]
@@ -143,13 +155,51 @@ def view_packages_status_one():
         
     input('Press "Enter" to continue...')
 
+def view_packages_status_due():
+    print('-------------------')
+    print('View status of packages due by a time')
+    print(f'Time: {dtime(seconds= wgups.time)}')
+    try:
+        input_time = input(f'Enter 4 digits time HHMM ({START_TIME.hhmm()} - {END_TIME.hhmm()}): ')
+        packages_ids = wgups.index.due_by(int(dtime(input_time)))
+        if len(packages_ids) == 0:
+            print('No package is due by this time')
+        for package_id in packages_ids:
+            print(wgups.packages[package_id].info)
+    except:
+        print('[Warning] Invalid time format')
+
+    input('Press "Enter" to continue...')
+
+def view_packages_status_zip_code():
+    print('-------------------')
+    print('View status of packages by zip code')
+    print(f'Time: {dtime(seconds= wgups.time)}')
+    zip_code = input('Enter zip code: ').strip()
+    packages_ids = wgups.index.zip_code(zip_code)
+    if len(packages_ids) == 0:
+        print('[Warning] No package for this zip code')
+    for package_id in packages_ids:
+        print(wgups.packages[package_id].info)
+
+    input('Press "Enter" to continue...')
+
+def view_trucks_position():
+    print('-------------------')
+    print('View position of all trucks')
+    print(f'Time: {dtime(seconds= wgups.time)}')
+    for truck in wgups.trucks.values():
+        print(f'{truck.id}: {wgups.truck_position(truck.id)}')
+
+    input('Press "Enter" to continue...')
+
 def view_packages_status_truck():
     print('-------------------')
     print('View status of all packages loaded onto a truck')
-    print(f'Time: {wgups.time}')
+    print(f'Time: {dtime(seconds= wgups.time)}')
     enter = -1
     time = wgups.time
-    routes_map = HashMap()
+    routes_map = Map()
 
     for route in wgups.routes.values():
         if route.start_time <= time and time <= route.end_time:
@@ -169,7 +219,7 @@ def view_packages_status_truck():
             print('-------------------')
             route = routes_map[enter]
             print(f'{route.truck.id} ({route.id})')
-            print(f'Time: {wgups.time}')
+            print(f'Time: {dtime(seconds= wgups.time)}')
             for stop in route.stops.values():
                 for package_id in stop.packages_ids:
                     package = wgups.packages[package_id]
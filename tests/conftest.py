@@ -0,0 +1,7 @@
+import pytest
+from C950.WGUPS import WGUPS
+
+@pytest.fixture(scope='session')
+def wgups():
+    # loaded from the csv files in the working directory, run with python -m pytest from the repository root
+    return WGUPS.instance()
@@ -0,0 +1,25 @@
+import pytest
+from C950.libs.Backend import DictMap, DictSet
+from C950.libs.Hash import HashMap, HashSet
+from C950.libs.Persistent import PersistentHashMap
+
+@pytest.mark.parametrize('cls', [DictMap, HashMap, PersistentHashMap])
+def test_map_node_contract(cls):
+    map = cls()
+    node = map.insert(1, 'a')
+    assert (node.key, node.value) == (1, 'a')
+    node = map.insert(1, 'b')
+    assert (node.key, node.value) == (1, 'b')
+    assert map[1] == 'b'
+    node = map.remove(1)
+    assert (node.key, node.value) == (1, 'b')
+    assert map.remove(1) is None
+    assert map[1] is None
+
+@pytest.mark.parametrize('cls', [DictSet, HashSet])
+def test_set_node_contract(cls):
+    set = cls()
+    assert set.insert(3).key == 3
+    assert set.insert(3).key == 3
+    assert set.remove(3).key == 3
+    assert set.remove(3) is None
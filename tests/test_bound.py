@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from C950.TSP.Bound import Bound
+from C950.TSP.Exact.HeldKarp import HeldKarp
+from test_held_karp import points_matrix, length
+
+@pytest.mark.parametrize('seed', range(15))
+@pytest.mark.parametrize('kind', ['round_trip', 'fixed_end', 'open'])
+def test_never_above_optimum(wgups, seed, kind):
+    n = 3 + seed % 8
+    D = points_matrix(n, seed)
+    if kind == 'round_trip':
+        D[-1] = D[0]
+        D[:, -1] = D[:, 0]
+    fixed_end = kind != 'open'
+    optimum = length(D, HeldKarp()._solve(D, fixed_end))
+
+    bound = Bound().nodes_bound(D, fixed_end, kind == 'round_trip')
+    assert 0 <= bound <= optimum + 1e-9
+    assert Bound().nodes_bound(D, fixed_end, kind == 'round_trip', upper= optimum) <= optimum + 1e-9
+
+def test_tight_on_a_line(wgups):
+    # points on a line: the optimal round trip is twice the span, the 1-tree bound reaches it
+    xs = [0, 1, 3, 4, 7]
+    D = [[abs(a - b) for b in xs + [0]] for a in xs + [0]]
+    bound = Bound().nodes_bound(np.array(D, dtype=float), True, True)
+    assert bound == pytest.approx(14)
+
+def test_routes_gap(wgups):
+    for route in wgups.routes.values():
+        assert route.lower_bound <= route.distance + 1e-9
+        assert route.gap is None or route.gap >= 0
@@ -0,0 +1,71 @@
+import os
+import time
+from C950.TSP.Cache import Cache
+
+def stops_of(route):
+    return [(stop.address_id, list(stop.packages_ids)) for stop in route.stops.values()]
+
+def test_round_trip(wgups, tmp_path):
+    cache = Cache(directory= str(tmp_path))
+    route = wgups.routes['Route 2A']
+    expected = stops_of(route)
+    distance = route.distance
+
+    assert not cache.load(route)
+    cache.save(route)
+    route.stops = None
+    assert cache.load(route)
+    route.finalize()
+    assert stops_of(route) == expected
+    assert route.distance == distance
+
+def test_key_follows_inputs(wgups, tmp_path):
+    cache = Cache(directory= str(tmp_path))
+    route = wgups.routes['Route 1B']
+    key = cache.key(route)
+    assert cache.key(route) == key
+
+    start_time = route.start_time
+    route.set_start_time(start_time + 600)
+    try:
+        assert cache.key(route) != key
+    finally:
+        route.set_start_time(start_time)
+
+def test_malformed_entry_is_a_miss(wgups, tmp_path):
+    cache = Cache(directory= str(tmp_path))
+    route = wgups.routes['Route 1B']
+    stops = route.stops
+    for content in ('not json', '{"stops": 1}', '{"stops": [["a", [1], 0]]}', '{"route": "x"}'):
+        with open(cache.path(cache.key(route)), 'w') as file:
+            file.write(content)
+        assert not cache.load(route)
+    assert route.stops is stops
+
+def test_evict(wgups, tmp_path):
+    cache = Cache(directory= str(tmp_path), max_bytes= 0)
+    cache.save(wgups.routes['Route 1A'])
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.json')] == []
+
+    old = tmp_path / 'old.tmp'
+    new = tmp_path / 'new.tmp'
+    old.write_text('')
+    new.write_text('')
+    past = time.time() - Cache.TMP_MAX_AGE - 1
+    os.utime(old, (past, past))
+    cache.evict()
+    assert not old.exists()
+    assert new.exists()
+
+def test_evict_least_recently_used(wgups, tmp_path):
+    cache = Cache(directory= str(tmp_path))
+    first, second = wgups.routes['Route 1A'], wgups.routes['Route 2B']
+    cache.save(first)
+    cache.save(second)
+    past = time.time() - 100
+    os.utime(cache.path(cache.key(second)), (past, past))
+
+    cache.max_bytes = os.path.getsize(cache.path(cache.key(first)))
+    cache.evict()
+    assert os.path.exists(cache.path(cache.key(first)))
+    assert not os.path.exists(cache.path(cache.key(second)))
@@ -0,0 +1,36 @@
+import numpy as np
+from C950.TSP.Evaluator import Evaluator
+
+def test_matches_routes(wgups):
+    routes = list(wgups.routes.values())
+    evaluator = Evaluator()
+    tours = evaluator.tours(routes)
+    assert tours.shape == (len(routes), max(len(route.stops) for route in routes))
+
+    speed = routes[0].truck.speed
+    evaluation = evaluator.evaluate(tours, [route.start_time for route in routes], speed)
+    for i, route in enumerate(routes):
+        assert evaluation.distance[i] == route.distance
+        assert evaluation.times[i, -1] == route.end_time
+        n = len(route.stops)
+        assert evaluation.times[i, :n].tolist() == route.arrivals
+
+def test_late_stops_match_route(wgups):
+    for route in wgups.routes.values():
+        evaluator = Evaluator.for_route(route)
+        evaluation = evaluator.evaluate(evaluator.tours([route]), route.start_time, route.truck.speed)
+        late_stops = set(wgups.packages[id].address_id for id in route.late_packages_ids)
+        assert evaluation.late[0] == len(late_stops)
+
+def test_padding_counts_a_late_stop_once():
+    D = np.array([[0, 10, 5], [10, 0, 7], [5, 7, 0.]])
+    evaluator = Evaluator(D, latest= [100000, 0, 0])
+    padded = evaluator.evaluate([[0, 1, 2, 2, 2], [0, 2, 1, 0, 0]], 28800, 18)
+    assert padded.late.tolist() == [2, 2]
+    assert padded.distance.tolist() == [17, 22]
+    assert evaluator.evaluate([[0, 1, 2]], 28800, 18).late.tolist() == [2]
+
+def test_start_time_per_row():
+    D = np.array([[0, 18.], [18, 0]])
+    evaluation = Evaluator(D, latest= [0, 0]).evaluate([[0, 1], [0, 1]], [0, 3600], 18)
+    assert evaluation.times[:, 1].tolist() == [3600, 7200]
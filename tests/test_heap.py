@@ -0,0 +1,59 @@
+import random
+import pytest
+from C950.libs.Heap import Heap
+
+def drain(heap):
+    items = []
+    while heap:
+        items.append(heap.pop())
+    return items
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_operations_against_sorted(seed):
+    rng = random.Random(seed)
+    heap = Heap()
+    priorities = {}
+    handles = {}
+    for item in range(60):
+        priorities[item] = rng.randint(0, 20)
+        handles[item] = heap.push(item, priorities[item])
+
+    for item in rng.sample(range(60), 20):
+        priorities[item] = rng.randint(-10, 30)
+        heap.update(handles[item], priorities[item])
+    for item in rng.sample(range(60), 10):
+        assert heap.remove(handles[item]) == (item, priorities.pop(item))
+        assert handles[item] not in heap
+
+    assert len(heap) == len(priorities)
+    assert heap.peek()[1] == min(priorities.values())
+    popped = drain(heap)
+    assert [priority for _, priority in popped] == sorted(priorities.values())
+    assert sorted(item for item, _ in popped) == sorted(priorities)
+
+def test_ties_pop_in_push_order():
+    heap = Heap()
+    for item in 'abcde':
+        heap.push(item, 1)
+    assert [item for item, _ in drain(heap)] == list('abcde')
+
+def test_handles():
+    heap = Heap()
+    a = heap.push('a', 5)
+    b = heap.push('b', 3)
+    assert a in heap and b in heap
+    heap.update(a, 1)
+    assert heap.peek() == ('a', 1)
+    assert heap.pop() == ('a', 1)
+    assert a not in heap
+    assert b in heap
+    heap.update(b, 10)
+    assert heap.pop() == ('b', 10)
+    assert not heap
+
+    with pytest.raises(IndexError):
+        heap.pop()
+    with pytest.raises(KeyError):
+        heap.update(b, 0)
+    with pytest.raises(KeyError):
+        heap.remove(a)
@@ -0,0 +1,69 @@
+import itertools
+import random
+import numpy as np
+import pytest
+from C950.TSP.Exact.HeldKarp import HeldKarp
+
+def points_matrix(n, seed):
+    rng = random.Random(seed)
+    points = np.array([[rng.random(), rng.random()] for _ in range(n)])
+    return np.round(np.linalg.norm(points[:, None] - points[None, :], axis=2) * 10, 1)
+
+def length(D, order):
+    return sum(D[a, b] for a, b in zip(order, order[1:]))
+
+def brute_force(D, fixed_end):
+    n = len(D)
+    last = n - 1 if fixed_end else n
+    best = float('inf')
+    for middle in itertools.permutations(range(1, last)):
+        order = [0, *middle] + ([n - 1] if fixed_end else [])
+        best = min(best, length(D, order))
+    return best
+
+@pytest.mark.parametrize('fixed_end', [True, False])
+@pytest.mark.parametrize('seed', range(12))
+def test_optimal_against_brute_force(wgups, seed, fixed_end):
+    n = 3 + seed % 6
+    D = points_matrix(n, seed)
+    order = HeldKarp()._solve(D, fixed_end)
+
+    assert sorted(order) == list(range(n))
+    assert order[0] == 0
+    if fixed_end:
+        assert order[-1] == n - 1
+    assert length(D, order) == pytest.approx(brute_force(D, fixed_end))
+
+def test_round_trip_end_is_start(wgups):
+    D = points_matrix(7, 99)
+    D[-1] = D[0]
+    D[:, -1] = D[:, 0]
+    order = HeldKarp()._solve(D, True)
+    assert length(D, order) == pytest.approx(brute_force(D, True))
+
+def test_routes_not_longer_than_insertion(wgups):
+    for route in wgups.routes.values():
+        distance = route.distance
+        stops = route.stops
+        HeldKarp().solve(route)
+        try:
+            route.finalize()
+            assert route.distance <= distance
+        finally:
+            route.stops = stops
+            route.finalize()
+
+def test_fallback_above_max_stops(wgups):
+    route = wgups.routes['Route 2A']
+    stops = route.stops
+    calls = []
+
+    class Fallback:
+        def identity(self):
+            return ['Fallback']
+        def solve(self, route):
+            calls.append(route.id)
+
+    HeldKarp(max_stops= 1, fallback= Fallback()).solve(route)
+    assert calls == ['Route 2A']
+    assert route.stops is stops
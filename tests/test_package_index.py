@@ -0,0 +1,44 @@
+def scan(wgups, match):
+    return sorted(package.id for package in wgups.packages.values() if match(package))
+
+def test_lookups_match_scans(wgups):
+    index = wgups.index
+    for address_id in wgups.addresses.keys():
+        assert sorted(index.address(address_id)) == scan(wgups, lambda p: p.address_id == address_id)
+    for route in wgups.routes.values():
+        assert sorted(index.route(route.id)) == sorted(route.packages_ids)
+        assert sorted(index.truck(route.truck.id)) == scan(wgups, lambda p: p.route.truck.id == route.truck.id)
+    for address in wgups.addresses.values():
+        assert sorted(index.zip_code(address.zip_code)) == scan(wgups, lambda p: wgups.addresses[p.address_id].zip_code == address.zip_code)
+        assert sorted(index.city(address.city)) == scan(wgups, lambda p: wgups.addresses[p.address_id].city == address.city)
+    assert index.route('No Route') == [] and index.zip_code('00000') == []
+
+def test_deadlines(wgups):
+    index = wgups.index
+    for time in (9 * 3600, 10 * 3600 + 30 * 60, 10 * 3600 + 30 * 60 - 1, 24 * 3600):
+        assert sorted(index.due_by(time)) == scan(wgups, lambda p: p.latest <= time)
+    start, end = 9 * 3600 + 1, 10 * 3600 + 30 * 60
+    assert sorted(index.due_between(start, end)) == scan(wgups, lambda p: start <= p.latest <= end)
+
+def test_update_on_change(wgups):
+    index = wgups.index
+    package = wgups.packages[9]
+    latest, address_id, route = package.latest, package.address_id, package.route
+    other_address_id = next(id for id in wgups.addresses.keys() if id != address_id)
+    other_route = next(r for r in wgups.routes.values() if r.truck.id != route.truck.id)
+    try:
+        package.latest = 60
+        package.address_id = other_address_id
+        package.route = other_route
+        assert index.due_by(60) == [9]
+        assert 9 in index.address(other_address_id) and 9 not in index.address(address_id)
+        assert 9 in index.route(other_route.id) and 9 not in index.route(route.id)
+        assert 9 in index.truck(other_route.truck.id) and 9 not in index.truck(route.truck.id)
+    finally:
+        package.latest = latest
+        package.address_id = address_id
+        package.route = route
+
+    assert 9 not in index.due_by(60) and 9 in index.due_by(latest)
+    assert 9 in index.address(address_id) and 9 not in index.address(other_address_id)
+    assert 9 in index.route(route.id) and 9 not in index.route(other_route.id)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from C950.data.PackageTable import PackageTable
+
+def table_of(rows):
+    table = PackageTable()
+    for id, latest, delivery in rows:
+        row = table.append(id, address_id=id, earliest=0, latest=latest, weight=id, notes='')
+        table.deliveries[row] = delivery
+    return table
+
+def test_queries_skip_unscheduled_and_dead_rows():
+    table = table_of([(1, 100, 90), (2, 100, 110), (3, 100, -1), (4, 200, 150)])
+    assert table.late_packages_ids() == [2]
+    assert table.delivered_between(90, 150) == [1, 2, 4]
+
+    copy = table.copy_row(1)
+    table.deliveries[copy] = 100
+    assert table.live.tolist() == [1, 0, 1, 1, 1]
+    assert table.late_packages_ids() == []
+    assert table.delivered_between(100, 110) == [2]
+
+    table.set_live([0, 1, 2, 3])
+    assert table.late_packages_ids() == [2]
+
+def test_copy_row():
+    table = table_of([(1, 100, 90)])
+    table.notes[0] = 'note'
+    table.routes_ids[0] = 3
+    copy = table.copy_row(0)
+    for name in PackageTable.COLUMNS:
+        if name != 'live':
+            assert getattr(table, name)[copy] == getattr(table, name)[0]
+    assert table.notes[copy] == 'note'
+    assert (table.live[0], table.live[copy]) == (0, 1)
+
+def test_column_is_a_view():
+    table = table_of([(1, 100, 90), (2, 100, 110)])
+    column = table.column('latest')
+    assert column.dtype == np.intc
+    table.latest[1] = 50
+    assert column.tolist() == [100, 50]
+    with pytest.raises(BufferError):
+        table.append(3, 3, 0, 0, 0, '')
+    del column
+    table.append(3, 3, 0, 0, 0, '')
+
+def test_queries_match_routes(wgups):
+    table = wgups.package_table
+    routes = list(wgups.routes.values())
+    assert sorted(table.late_packages_ids()) == sorted(id for route in routes for id in route.late_packages_ids)
+    weights = table.weight_per_route()
+    for route in routes:
+        assert weights[route.id] == route.weight
+    assert weights['Route 1B'] == 17
+
+    start, end = 9 * 3600, 10 * 3600
+    expected = [package.id for package in wgups.packages.values() if start <= package.delivery_time <= end]
+    assert sorted(table.delivered_between(start, end)) == sorted(expected)
@@ -0,0 +1,58 @@
+import copy
+import random
+from C950.libs.Persistent import PersistentHashMap
+
+def test_snapshot_isolation():
+    rng = random.Random(0)
+    map = PersistentHashMap()
+    expected = {}
+    for key in rng.sample(range(1000), 200):
+        map[key] = expected[key] = rng.random()
+
+    snapshot = map.snapshot()
+    frozen = dict(expected)
+    for key in rng.sample(list(expected), 50):
+        map.remove(key)
+        del expected[key]
+    for key in rng.sample(range(1000), 50):
+        map[key] = expected[key] = rng.random()
+
+    assert dict(map.items()) == expected
+    assert dict(snapshot.items()) == frozen
+    assert list(snapshot.keys()) == sorted(frozen)
+    assert len(map) == len(expected) and len(snapshot) == len(frozen)
+
+def test_snapshot_updates_are_not_seen():
+    map = PersistentHashMap()
+    for key in range(10):
+        map[key] = key
+    snapshot = map.snapshot()
+    snapshot[3] = 'branch'
+    snapshot.remove(4)
+    assert map[3] == 3 and map[4] == 4
+    assert snapshot[3] == 'branch' and 4 not in snapshot
+    assert map.snapshot()[3] == 3
+
+def test_route_copy(wgups):
+    route = wgups.routes['Route 1A']
+    following = [r for r in wgups.routes.values() if r.start_after is route]
+    package = wgups.packages[route.packages_ids[0]]
+    end_time, delivery_time = route.end_time, package.delivery_time
+    times = [stop.time for stop in route.stops.values()]
+
+    branch = copy.copy(route)
+    try:
+        branch.set_start_time(route.start_time + 3600)
+        assert package.route is branch
+        assert all(r.start_after is branch for r in following)
+        assert branch.end_time == end_time + 3600
+        assert package.delivery_time == delivery_time + 3600
+        assert [stop.time for stop in route.stops.values()] == times
+        assert all(stop.route is branch for stop in branch.stops.values())
+    finally:
+        wgups.package_table.set_route(route)
+        route.finalize()
+
+    assert package.route is route
+    assert package.delivery_time == delivery_time
+    assert all(r.start_after is route for r in following)
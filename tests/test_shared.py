@@ -0,0 +1,29 @@
+import gc
+import numpy as np
+import pytest
+from C950.libs.Shared import SharedArray, attach, rows, array
+
+def test_views_read_the_array():
+    data = np.arange(12, dtype=np.intc).reshape(3, 4)
+    with SharedArray(data) as shared:
+        assert list(attach(shared.handle)) == list(range(12))
+        assert [list(row) for row in rows(shared.handle)] == data.tolist()
+        assert np.array_equal(array(shared.handle), data)
+        assert not array(shared.handle).flags.writeable
+
+def test_close_releases_views():
+    shared = SharedArray(np.arange(6, dtype=np.intc).reshape(2, 3))
+    view, row = attach(shared.handle), rows(shared.handle)[1]
+    shared.close()
+    with pytest.raises(ValueError):
+        view[0]
+    with pytest.raises(ValueError):
+        row[0]
+
+def test_array_outlives_close():
+    shared = SharedArray(np.arange(6, dtype=np.intc).reshape(2, 3))
+    row = array(shared.handle)[1]
+    shared.close()
+    assert row.tolist() == [3, 4, 5]
+    del row
+    gc.collect()
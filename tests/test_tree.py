@@ -0,0 +1,65 @@
+import random
+import pytest
+from C950.libs.Hash import HashMap
+
+def inorder(map):
+    return [node.value for node in map]
+
+def check_tree(map):
+    values = inorder(map)
+    assert values == sorted(values)
+    assert len(values) == len(map)
+    assert [node.value for node in reversed(map)] == values[::-1]
+    for i, node in enumerate(map):
+        assert map.select(i) is node
+        assert map.rank(node) == i
+        assert abs(node.get_balance()) <= 1
+
+@pytest.mark.parametrize('seed', range(50))
+def test_mixed_batch(seed):
+    rng = random.Random(seed)
+    map = HashMap(order_by='value')
+    for key in range(40):
+        map[key] = rng.random()
+
+    with map.batch():
+        for key in rng.sample(range(40), 5):
+            map[key] = rng.random()
+        for key in range(40, 45):
+            map[key] = rng.random()
+        for key in rng.sample(range(45), 5):
+            map.remove(key)
+        for key in rng.sample(list(map.keys()), 5):
+            map[key] = rng.random()
+
+    assert len(map) == 40
+    check_tree(map)
+
+def test_insert_in_nested_batch():
+    map = HashMap(order_by='value')
+    for key in range(20):
+        map[key] = key
+
+    with map.batch():
+        for key in range(10):
+            map[key] = 100 - key
+        with map.batch():
+            map[20] = 50
+            map[21] = -1
+        map[0] = 10.5
+
+    check_tree(map)
+    assert inorder(map)[:2] == [-1, 10]
+
+def test_rebuild_batch():
+    map = HashMap(order_by='value')
+    for key in range(30):
+        map[key] = key
+
+    with map.batch():
+        for key in range(30):
+            map[key] = -key
+        map[30] = 0.5
+
+    check_tree(map)
+    assert inorder(map)[0] == -29